@@ -0,0 +1,154 @@
+# standard imports
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# bittensor import
+import bittensor
+
+# Local imports
+from .constants import (
+    ARCHIVE_CACHE_FILE_NAME,
+    ARCHIVE_CACHE_FOLDER,
+    ARCHIVE_CACHE_MAX_SIZE,
+)
+
+
+class ArchiveCache:
+    # A size bounded on-disk cache for values derived from the chain state at past
+    # blocks, which never changes.
+    #
+    # The entries are rows of a single sqlite database in the cache folder, keyed by the
+    # hash of their key, and are evicted least recently used first. The size of an
+    # entry is the length of its serialized key and value, which is close to what it
+    # takes up in the database since sqlite packs the rows into shared pages. Keys need
+    # to identify the chain (i.e. by its genesis hash) since the same blocks exist on
+    # every network.
+    _version = 2
+
+    def __init__(self, cache_folder=ARCHIVE_CACHE_FOLDER, max_size=ARCHIVE_CACHE_MAX_SIZE):
+        self._cache_folder = os.path.expanduser(cache_folder)
+        self._max_size = max_size
+        self._size = None
+        self._num_hits = 0
+        self._num_misses = 0
+
+        os.makedirs(self._cache_folder, exist_ok=True)
+        self._connection = sqlite3.connect(
+            os.path.join(self._cache_folder, ARCHIVE_CACHE_FILE_NAME), timeout=30
+        )
+        # WAL lets the writers and the check scripts share the cache, and makes the
+        # last use updates cheap.
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key_hash TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            """
+        )
+
+    @property
+    def num_hits(self):
+        return self._num_hits
+
+    @property
+    def num_misses(self):
+        return self._num_misses
+
+    def close(self):
+        self._connection.close()
+
+    def get(self, key):
+        key_hash, key_json = get_key_hash(key)
+        try:
+            row = self._connection.execute(
+                "SELECT version, key, value FROM entries WHERE key_hash = ?", (key_hash,)
+            ).fetchone()
+            if row is not None:
+                with self._connection:
+                    self._connection.execute(
+                        "UPDATE entries SET last_used = ? WHERE key_hash = ?",
+                        (time.time(), key_hash)
+                    )
+        except sqlite3.Error as err:
+            bittensor.logging.warning(f"Failed to read the archive cache: {err}")
+            row = None
+
+        # Guard against hash collisions and entries from older versions.
+        if row is None or row[0] != self._version or row[1] != key_json:
+            self._num_misses += 1
+            return None
+
+        self._num_hits += 1
+        return json.loads(row[2])
+
+    def put(self, key, value):
+        key_hash, key_json = get_key_hash(key)
+        value_json = json.dumps(value)
+        size = len(key_hash) + len(key_json) + len(value_json)
+        try:
+            self._size = self._get_size()
+            with self._connection:
+                old_row = self._connection.execute(
+                    "SELECT size FROM entries WHERE key_hash = ?", (key_hash,)
+                ).fetchone()
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    (key_hash, self._version, key_json, value_json, size, time.time())
+                )
+        except sqlite3.Error as err:
+            bittensor.logging.warning(f"Failed to write to the archive cache: {err}")
+            return
+
+        self._size += size - (old_row[0] if old_row else 0)
+        if self._size > self._max_size:
+            self._evict()
+
+    def _get_size(self):
+        # The size is only added up from the entries once and then kept up to date.
+        if self._size is None:
+            self._size = self._connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+        return self._size
+
+    def _evict(self):
+        # Evict down to 90% of the max size so that every put after the cache fills
+        # up doesn't have to evict.
+        target_size = int(self._max_size * 0.9)
+        key_hashes = []
+        evicted_size = 0
+        try:
+            for key_hash, size in self._connection.execute(
+                "SELECT key_hash, size FROM entries ORDER BY last_used"
+            ):
+                if self._size - evicted_size <= target_size:
+                    break
+                key_hashes.append((key_hash,))
+                evicted_size += size
+
+            with self._connection:
+                self._connection.executemany(
+                    "DELETE FROM entries WHERE key_hash = ?", key_hashes
+                )
+        except sqlite3.Error as err:
+            bittensor.logging.warning(f"Failed to evict archive cache entries: {err}")
+            return
+
+        self._size -= evicted_size
+        bittensor.logging.info(f"Evicted {len(key_hashes)} archive cache entries.")
+
+
+def get_key_hash(key):
+    key_json = json.dumps(list(key))
+    return hashlib.sha256(key_json.encode()).hexdigest(), key_json
@@ -34,7 +34,14 @@ DEFAULT_NUM_INTERVALS_JSON = 30
 DEFAULT_NUM_INTERVALS_NO_JSON = 10
 DATA_FILE_NAME = "validator_data.json"
 TIMESTAMP_FILE_NAME = "timestamp.json"
+MANIFEST_FILE_NAME = "manifest.json"
+JSON_READER_MAX_ENTRIES = 1024
+REGISTERED_SUBNETS_FILE_NAME = "registered_subnets.json"
+INTERVAL_STORE_FOLDER_NAME = "store"
+PUBLISH_VERSIONS_FOLDER_NAME = "versions"
+PUBLISH_CURRENT_LINK_NAME = "current"
 LOCAL_TIMEZONE = "MST7MDT"
+DAEMON_WORKER_TIMEOUT = 1800  # 30 minutes
 LOCAL_LITE_SUBTENSORS = [
     "cali",
     "candyland",
@@ -44,6 +51,80 @@ LOCAL_LITE_SUBTENSORS = [
     "titan",
 ]
 
+ENDPOINT_PROBE_TIMEOUT = 5.0  # seconds
+ENDPOINT_PROBE_GRACE = 0.5  # seconds to wait for the rest after the first answer
+ENDPOINT_SCORE_WEIGHT = 0.3
+ENDPOINT_ERROR_PENALTY = 10.0
+ENDPOINT_FAILURE_COOLDOWN = 60.0  # seconds after a failed run, doubled per failure in a row
+ENDPOINT_MAX_FAILURE_COOLDOWN = 900.0  # seconds
+
+
+##############################
+# Request scheduler constants
+##############################
+DEFAULT_MAX_CONCURRENCY = 64
+MIN_CONCURRENCY = 4
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0  # seconds
+RETRY_MAX_DELAY = 10.0  # seconds
+SHARD_BATCH_SIZE = 8  # netuids
+SHARD_MAX_ATTEMPTS = 5
+SHARD_MAX_FAILURES = 3  # failed batches in a row before a subtensor is dropped
+STORAGE_BATCH_SIZE = 256  # storage keys per multi-key request
+LAST_UPDATE_RANGE_BLOCKS = 1000  # blocks per state_queryStorage request
+LAST_UPDATE_RANGES_PER_BATCH = 4
+LAST_UPDATE_LOOKBACK_TEMPOS = 2  # tempos per interval to look back for weight-set blocks
+LAST_UPDATE_MAX_LOOKBACK_BLOCKS = 30000
+GLOBAL_MAX_SUBNET_COUNT = 4096  # netuid stride of the per mechanism storage index
+
+
+##########################
+# Archive cache constants
+##########################
+ARCHIVE_CACHE_FOLDER = "~/.cache/validator_checker/archive"
+ARCHIVE_CACHE_FILE_NAME = "archive_cache.sqlite"
+ARCHIVE_CACHE_MAX_SIZE = 256 * 1024 * 1024  # bytes
+ARCHIVE_CACHE_FINALITY_BLOCKS = 10  # recent blocks that aren't cached
+
+
+##############################
+# Snapshot database constants
+##############################
+SNAPSHOT_RAW_RETENTION = 2 * 86400  # seconds
+SNAPSHOT_HOURLY_RETENTION = 60 * 86400  # seconds
+
+
+###################################
+# Deregistration monitor constants
+###################################
+# Fall back to a full scan when the finalized blocks jump by more than this.
+DEREG_EVENTS_MAX_CATCHUP_BLOCKS = 20
+# Warn when the registered subnets written by write_validator_data_main are older.
+DEREG_REGISTERED_SUBNETS_MAX_AGE = 1800  # 30 minutes
+# Events that register or remove neurons on the subnet given by their first attribute.
+DEREG_NETUID_EVENTS = [
+    "NeuronRegistered",
+    "BulkNeuronsRegistered",
+    "NetworkAdded",
+    "NetworkRemoved",
+]
+# Events that can change the hotkeys of the coldkey and need a full scan.
+DEREG_RESCAN_EVENTS = [
+    "HotkeySwapped",
+    "ColdkeySwapped",
+]
+DEREG_WEBHOOK_URL = (
+    "https://discord.com/api/webhooks/1328849265765777468/"
+    "yJg07DYWLJyiFZgZPaLGTmFEwiAu2JWW5osyjFVoqlMWT66JBbV9_FOcslvDdtibtcR0"
+)
+DEREG_AT_USERS = "<@297973047326146570> <@711033117485301811> <@795991134706991126>"
+NOTIFY_COALESCE_DELAY = 2.0  # seconds to wait for more messages to send together
+NOTIFY_MAX_ATTEMPTS = 5
+NOTIFY_RETRY_BASE_DELAY = 1.0  # seconds
+NOTIFY_RETRY_MAX_DELAY = 60.0  # seconds
+NOTIFY_REQUEST_TIMEOUT = 10.0  # seconds
+NOTIFY_CLOSE_TIMEOUT = 60.0  # seconds to wait for the pending messages on close
+NOTIFY_MAX_MESSAGE_LENGTH = 2000  # discord's limit on the message content
 
 #########################
 # Subnet price constants
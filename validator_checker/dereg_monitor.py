@@ -3,8 +3,6 @@ import asyncio
 import glob
 import json
 import os
-import shlex
-import subprocess
 import time
 
 # bittensor import
@@ -14,19 +12,37 @@ import bittensor
 from .constants import (
     COLDKEYS,
     DATA_FILE_NAME,
+    DEREG_AT_USERS,
+    DEREG_EVENTS_MAX_CATCHUP_BLOCKS,
+    DEREG_NETUID_EVENTS,
+    DEREG_REGISTERED_SUBNETS_MAX_AGE,
+    DEREG_RESCAN_EVENTS,
+    DEREG_WEBHOOK_URL,
+    PUBLISH_CURRENT_LINK_NAME,
+    REGISTERED_SUBNETS_FILE_NAME,
+    TIMESTAMP_FILE_NAME,
 )
+from .metagraph_projection import get_all_metagraph_infos
+from .notifier import (
+    close_notification_dispatcher,
+    get_notification_dispatcher,
+)
+from .folder_watcher import FolderWatcher
+from .json_reader import get_json_reader
+from .runtime_cache import get_async_subtensor
+from .scheduler import AdaptiveScheduler
+from .serialization import strip_compression_suffix
+from .storage_reader import BulkStorageReader
 from .utils import (
+    get_formatted_time,
     get_json_file_name,
+    get_published_folder,
     SubtensorConnectionError,
 )
 
 
 class DeregChecker:
-    _discord_monitor_url = (
-        "https://discord.com/api/webhooks/1328849265765777468/"
-        "yJg07DYWLJyiFZgZPaLGTmFEwiAu2JWW5osyjFVoqlMWT66JBbV9_FOcslvDdtibtcR0"
-    )
-    _at_users = "<@297973047326146570> <@711033117485301811> <@795991134706991126>"
+    _webhook_url = DEREG_WEBHOOK_URL
 
     def _compare_and_notify(self, previous_registered_list, new_registered_list):
         # First run. Only creates the list. Nothing to compare yet.
@@ -43,27 +59,22 @@ class DeregChecker:
         bittensor.logging.info(f"Currently registered on subnets:  {new_registered_list}")
         bittensor.logging.info(f"Deregistered from subnets: {deregistered_list}")
 
-        for netuid in deregistered_list:
-            message = f"We have been de-registered from subnet {netuid}"
-            self._notify(message)
+        # Send a single message for all subnets rather than one per subnet.
+        if len(deregistered_list) == 1:
+            self._notify(f"We have been de-registered from subnet {deregistered_list[0]}")
+        elif deregistered_list:
+            netuids_str = ", ".join(str(n) for n in deregistered_list)
+            self._notify(f"We have been de-registered from subnets {netuids_str}")
 
-    def _notify(self, message):
-        message = self._at_users + " \u203C\uFE0F " + message
-        payload = json.dumps({"content": message})
-        monitor_cmd = [
-            "curl", "-H", "Content-Type: application/json",
-            "-d", payload, self._discord_monitor_url
-        ]
-        monitor_cmd_str = shlex.join(monitor_cmd)
+    def _set_webhook_url(self, args):
+        self._webhook_url = getattr(args, "webhook_url", None) or DEREG_WEBHOOK_URL
 
-        bittensor.logging.info(f"Running command: '{monitor_cmd_str}'")
-        try:
-            subprocess.run(monitor_cmd, check=True)
-        except subprocess.CalledProcessError as exc:
-            bittensor.logging.error("Failed to send discord monitor notification.")
-            bittensor.logging.error(f"'{monitor_cmd_str}' command failed with error: {exc}")
-        else:
-            bittensor.logging.info("Discord monitor notification successfully sent.")
+    def _notify(self, message):
+        # The message is sent in the background so the check doesn't wait on it.
+        notification_dispatcher = get_notification_dispatcher(
+            self._webhook_url, prefix=DEREG_AT_USERS + " \u203C\uFE0F "
+        )
+        notification_dispatcher.notify(message)
 
 
 class DeregCheckerSubtensor(DeregChecker):
@@ -72,8 +83,15 @@ class DeregCheckerSubtensor(DeregChecker):
     def __init__(self, args):
         self._json_file = os.path.join(args.json_folder, self._json_file_name)
         self._network = args.network
+        self._scan_mode = getattr(args, "scan_mode", "metagraph")
+        self._set_webhook_url(args)
 
-        asyncio.run(self._run_check())
+        # The check runs in a short lived process so the notifications are sent
+        # before it exits.
+        try:
+            asyncio.run(self._run_check())
+        finally:
+            close_notification_dispatcher()
 
     async def _run_check(self):
         bittensor.logging.info("")
@@ -89,18 +107,21 @@ class DeregCheckerSubtensor(DeregChecker):
         start_time = time.time()
         bittensor.logging.info(f"Connecting to subtensor: {self._network}")
         try:
-            async with bittensor.AsyncSubtensor(network=self._network) as subtensor:
+            async with get_async_subtensor(self._network) as subtensor:
                 netuids = await subtensor.get_all_subnets_netuid()
                 netuids = netuids[1:]
                 bittensor.logging.info(f"Checking subnets: {netuids}")
 
                 block = await subtensor.block
-                metagraphs = await asyncio.gather(
-                    *[
-                        subtensor.metagraph(netuid=netuid, block=block)
-                        for netuid in netuids
-                    ]
-                )
+
+                if self._scan_mode == "coldkey":
+                    registered_list = await self._get_registered_list_from_coldkey(
+                        subtensor, netuids, block
+                    )
+                else:
+                    registered_list = await self._get_registered_list_from_metagraphs(
+                        subtensor, netuids, block
+                    )
         except Exception as err:
             bittensor.logging.error(f"ERROR: Subtensor connection failed on '{self._network}'")
             bittensor.logging.error(f"{type(err).__name__}: {err}")
@@ -109,9 +130,50 @@ class DeregCheckerSubtensor(DeregChecker):
         total_time = time.time() - start_time
         bittensor.logging.info(f"Gathered subnet data in {total_time:.3} seconds")
 
-        registered_list = [m.netuid for m in metagraphs if m.coldkeys.count(COLDKEYS["Rizzo"])]
         return registered_list
 
+    async def _get_registered_list_from_metagraphs(self, subtensor, netuids, block):
+        # Get the metagraph info of all subnets at once when the subtensor
+        # supports it and fall back to a metagraph per subnet otherwise.
+        metagraph_infos = await get_all_metagraph_infos(subtensor, block) or {}
+        missing_netuids = [n for n in netuids if n not in metagraph_infos]
+        metagraphs = [metagraph_infos[n] for n in netuids if n in metagraph_infos]
+        metagraphs += await asyncio.gather(
+            *[
+                subtensor.metagraph(netuid=netuid, block=block)
+                for netuid in missing_netuids
+            ]
+        )
+
+        return sorted(
+            m.netuid for m in metagraphs if m.coldkeys.count(COLDKEYS["Rizzo"])
+        )
+
+    async def _get_registered_list_from_coldkey(self, subtensor, netuids, block):
+        # Rather than downloading the metagraph of every subnet, read the hotkeys that
+        # the Rizzo coldkey owns and whether each of them is registered on each subnet.
+        # The metagraph coldkeys are the owners of the registered hotkeys, so this
+        # gives the same subnets.
+        hotkeys = await subtensor.get_owned_hotkeys(COLDKEYS["Rizzo"], block=block)
+        bittensor.logging.info(f"Checking {len(hotkeys)} hotkeys owned by the Rizzo coldkey.")
+        self._hotkeys = hotkeys
+
+        return await self._get_registered_netuids(subtensor, hotkeys, netuids, block)
+
+    async def _get_registered_netuids(self, subtensor, hotkeys, netuids, block):
+        params_list = [[hotkey, netuid] for hotkey in hotkeys for netuid in netuids]
+        storage_reader = BulkStorageReader(subtensor, AdaptiveScheduler(), block)
+        is_members = await storage_reader.query("IsNetworkMember", params_list)
+
+        registered_netuids = set()
+        for (_, netuid), is_member in zip(params_list, is_members):
+            if isinstance(is_member, Exception):
+                raise is_member
+            if is_member:
+                registered_netuids.add(netuid)
+
+        return sorted(registered_netuids)
+
     def _read_registered_list_json_file(self):
         if not os.path.exists(self._json_file):
             bittensor.logging.warning(f"Json file {self._json_file} does not exist. "
@@ -126,33 +188,241 @@ class DeregCheckerSubtensor(DeregChecker):
             return json.dump(registered_subnet_list, fp)
 
 
+class DeregCheckerEvents(DeregCheckerSubtensor):
+    # Watches the finalized blocks rather than polling.
+    #
+    # After a full coldkey scan, the events of every finalized block are checked for
+    # neurons registered on (which may replace one of our uids) or networks removed
+    # from any subnet, and only the registration of our hotkeys on those subnets is
+    # read again. Blocks without such events cost a single events read. A full scan is
+    # still made every --interval minutes, when the hotkeys may have changed (swaps) or
+    # when the finalized blocks jump too far to catch up on their events. on_scan is
+    # called after every successful full scan.
+    def __init__(self, args, on_scan=None):
+        self._json_file = os.path.join(args.json_folder, self._json_file_name)
+        self._network = args.network
+        self._rescan_interval = round(args.interval * 60)
+        self._hotkeys = []
+        self._registered_list = None
+        self._last_block = None
+        self._last_scan_time = 0
+        self._on_scan = on_scan
+        self._set_webhook_url(args)
+
+        asyncio.run(self._run_check())
+
+    async def _run_check(self):
+        bittensor.logging.info("")
+        bittensor.logging.info("Watching registration events on the subtensor chain.")
+
+        self._registered_list = self._read_registered_list_json_file()
+        bittensor.logging.info(f"Connecting to subtensor: {self._network}")
+        try:
+            async with get_async_subtensor(self._network) as subtensor:
+                self._subtensor = subtensor
+                await subtensor.substrate.subscribe_block_headers(
+                    self._on_finalized_block, finalized_only=True
+                )
+        except Exception as err:
+            bittensor.logging.error(f"ERROR: Subtensor connection failed on '{self._network}'")
+            bittensor.logging.error(f"{type(err).__name__}: {err}")
+            raise SubtensorConnectionError
+
+    async def _on_finalized_block(self, obj, update_nr, subscription_id):
+        block = obj["header"]["number"]
+        if isinstance(block, str):
+            block = int(block, 16)
+
+        if (
+            self._last_block is None
+            or block - self._last_block > DEREG_EVENTS_MAX_CATCHUP_BLOCKS
+            or time.time() - self._last_scan_time >= self._rescan_interval
+        ):
+            await self._scan(block)
+        elif block > self._last_block:
+            netuids, rescan = await self._get_event_netuids(self._last_block + 1, block)
+            if rescan:
+                await self._scan(block)
+            elif netuids:
+                await self._check_netuids(netuids, block)
+
+        self._last_block = max(block, self._last_block or 0)
+
+        # Keep the subscription going.
+        return None
+
+    async def _scan(self, block):
+        start_time = time.time()
+        netuids = (await self._subtensor.get_all_subnets_netuid(block=block))[1:]
+        registered_list = await self._get_registered_list_from_coldkey(
+            self._subtensor, netuids, block
+        )
+        self._last_scan_time = time.time()
+        bittensor.logging.info(
+            f"Scanned {len(netuids)} subnets at block {block} in "
+            f"{self._last_scan_time - start_time:.3} seconds"
+        )
+        self._update_registered_list(registered_list)
+        if self._on_scan is not None:
+            self._on_scan()
+
+    async def _check_netuids(self, netuids, block):
+        bittensor.logging.info(f"Checking subnets {netuids} at block {block}.")
+        registered_netuids = await self._get_registered_netuids(
+            self._subtensor, self._hotkeys, netuids, block
+        )
+        registered_list = sorted(
+            set(self._registered_list or []).difference(netuids).union(registered_netuids)
+        )
+        self._update_registered_list(registered_list)
+
+    def _update_registered_list(self, registered_list):
+        if registered_list == self._registered_list:
+            return
+        self._compare_and_notify(self._registered_list, registered_list)
+        self._write_registered_list_json_file(registered_list)
+        self._registered_list = registered_list
+
+    async def _get_event_netuids(self, from_block, to_block):
+        # Returns the subnets that the events of the blocks touch and whether a full
+        # scan is needed.
+        substrate = self._subtensor.substrate
+        block_hashes = await asyncio.gather(
+            *[substrate.get_block_hash(b) for b in range(from_block, to_block + 1)]
+        )
+        block_events = await asyncio.gather(
+            *[substrate.get_events(block_hash) for block_hash in block_hashes]
+        )
+
+        netuids = set()
+        for events in block_events:
+            for event in events:
+                event = event["event"]
+                if event["module_id"] != "SubtensorModule":
+                    continue
+                if event["event_id"] in DEREG_RESCAN_EVENTS:
+                    bittensor.logging.info(f"Got {event['event_id']} event.")
+                    return [], True
+                if event["event_id"] in DEREG_NETUID_EVENTS:
+                    netuid = get_event_netuid(event["attributes"])
+                    if netuid is None:
+                        return [], True
+                    netuids.add(netuid)
+
+        # The root network isn't checked.
+        netuids.discard(0)
+        return sorted(netuids), False
+
+
 class DeregCheckerJson(DeregChecker):
     def __init__(self, args):
-        json_file_name_glob = get_json_file_name(DATA_FILE_NAME, "*")
-        self._json_file_glob = os.path.join(args.json_folder, json_file_name_glob)
+        self._json_folder = args.json_folder
+        self._json_file_name_glob = get_json_file_name(DATA_FILE_NAME, "*")
+        self._json_file_glob = os.path.join(self._json_folder, self._json_file_name_glob)
         self._registered_list = None
+        self._json_reader = get_json_reader()
+        self._set_webhook_url(args)
 
     def run_check(self):
-        bittensor.logging.info("")
-        bittensor.logging.info(f"Checking registration status from {self._json_file_glob} files.")
+        # Read all files from the same published version. The registered subnets
+        # written by write_validator_data_main are used when they're there, and
+        # otherwise the list is gathered from the validator data files.
+        published_folder = get_published_folder(self._json_folder)
+        registered_subnets_file = os.path.join(published_folder, REGISTERED_SUBNETS_FILE_NAME)
 
+        bittensor.logging.info("")
         previous_registered_list = self._registered_list
-        new_registered_list = self._get_registered_list_from_data_json_file()
+        if os.path.isfile(registered_subnets_file):
+            bittensor.logging.info(
+                f"Checking registration status from {registered_subnets_file}."
+            )
+            checked_netuids, registered_list = (
+                self._get_registered_list_from_registered_subnets_file(
+                    registered_subnets_file
+                )
+            )
+        else:
+            self._json_file_glob = os.path.join(published_folder, self._json_file_name_glob)
+            bittensor.logging.info(
+                f"Checking registration status from {self._json_file_glob} files."
+            )
+            checked_netuids, registered_list = (
+                self._get_registered_list_from_data_json_file()
+            )
+
+        # Only the registration on the checked subnets is known, so the previous
+        # status is kept for the subnets that weren't gathered this time rather than
+        # reporting them as deregistered.
+        if previous_registered_list and registered_list is not None:
+            new_registered_list = sorted(
+                set(previous_registered_list)
+                .difference(checked_netuids)
+                .union(registered_list)
+            )
+        else:
+            new_registered_list = registered_list
 
         self._compare_and_notify(previous_registered_list, new_registered_list)
         self._registered_list = new_registered_list
 
+    def watch(self, timeout):
+        # Check every time write_validator_data_main finishes writing to the json
+        # folder rather than on a timer. The timestamp file is written last or, when
+        # publishing versions, the current link is switched last. The check still
+        # runs after timeout seconds without a write so that stale data is reported.
+        watcher = FolderWatcher(
+            self._json_folder, [TIMESTAMP_FILE_NAME, PUBLISH_CURRENT_LINK_NAME]
+        )
+        try:
+            self.run_check()
+            while True:
+                if not watcher.wait(timeout):
+                    bittensor.logging.warning(
+                        f"Nothing was written to {self._json_folder} in "
+                        f"{get_formatted_time(round(timeout))}."
+                    )
+                self.run_check()
+        finally:
+            watcher.close()
+
+    def _get_registered_list_from_registered_subnets_file(self, registered_subnets_file):
+        registered_subnets = self._json_reader.read(registered_subnets_file)
+
+        age = time.time() - registered_subnets["time"]
+        if age > DEREG_REGISTERED_SUBNETS_MAX_AGE:
+            bittensor.logging.warning(
+                f"The registered subnets at block {registered_subnets['block']} are "
+                f"{get_formatted_time(round(age))} old."
+            )
+
+        return registered_subnets["netuids"], list(registered_subnets["registered"])
+
     def _get_registered_list_from_data_json_file(self):
-        json_files = glob.glob(self._json_file_glob)
+        json_files = [
+            f for f in glob.glob(f"{self._json_file_glob}*")
+            if strip_compression_suffix(f).endswith(".json")
+        ]
         if not json_files:
             bittensor.logging.error(f"No json files found: {self._json_file_glob}.")
-            return
+            return [], None
 
+        checked_netuids = []
         registered_list = []
         for json_file in json_files:
             bittensor.logging.info(f"Reading data from {json_file}.")
-            with open(json_file, "r") as fp:
-                json_data = json.load(fp)
+            json_data = self._json_reader.read(
+                json_file, fields=("*", "validator_hotkeys", "Rizzo")
+            )
+            checked_netuids.extend([int(u) for u in json_data])
             registered_list.extend([int(u) for u in json_data if json_data[u]["validator_hotkeys"]["Rizzo"]])
 
-        return sorted(registered_list)
+        return checked_netuids, sorted(registered_list)
+
+
+def get_event_netuid(attributes):
+    # The attributes are either a tuple with the netuid first or a dict.
+    if isinstance(attributes, dict):
+        return attributes.get("netuid")
+    if isinstance(attributes, (list, tuple)) and attributes:
+        return attributes[0]
+    return None
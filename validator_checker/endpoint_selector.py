@@ -0,0 +1,185 @@
+# standard imports
+import asyncio
+import json
+import time
+import websockets
+
+# bittensor import
+import bittensor
+
+# Local imports
+from .constants import (
+    ENDPOINT_ERROR_PENALTY,
+    ENDPOINT_FAILURE_COOLDOWN,
+    ENDPOINT_MAX_FAILURE_COOLDOWN,
+    ENDPOINT_PROBE_GRACE,
+    ENDPOINT_PROBE_TIMEOUT,
+    ENDPOINT_SCORE_WEIGHT,
+    LOCAL_LITE_SUBTENSORS,
+)
+from .utils import get_lite_subtensor_networks
+
+
+class EndpointScore:
+    # Rolling latency and error rates for one subtensor.
+    #
+    # The health probes and the actual runs are tracked separately so that an endpoint
+    # that answers the probe but fails the runs doesn't get its run failures erased by
+    # the probe that's made before every selection. A failed run also puts the
+    # endpoint in a cooldown, doubling with every failure in a row, during which it's
+    # only selected when every other endpoint is unavailable too.
+    def __init__(self):
+        self.latency = None
+        self.error_rate = 0.0
+        self.run_error_rate = 0.0
+        self.num_run_failures = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def score(self):
+        # Lower is better. Endpoints that have never answered go last.
+        if self.latency is None:
+            return float("inf")
+        return self.latency * (
+            1 + ENDPOINT_ERROR_PENALTY * (self.error_rate + self.run_error_rate)
+        )
+
+    @property
+    def in_cooldown(self):
+        return time.monotonic() < self.cooldown_until
+
+    def add_latency(self, latency):
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += ENDPOINT_SCORE_WEIGHT * (latency - self.latency)
+
+    def add_probe_success(self):
+        self.error_rate *= (1 - ENDPOINT_SCORE_WEIGHT)
+
+    def add_probe_failure(self):
+        self.error_rate += ENDPOINT_SCORE_WEIGHT * (1 - self.error_rate)
+
+    def add_run_success(self):
+        self.run_error_rate *= (1 - ENDPOINT_SCORE_WEIGHT)
+        self.num_run_failures = 0
+        self.cooldown_until = 0.0
+
+    def add_run_failure(self):
+        self.run_error_rate += ENDPOINT_SCORE_WEIGHT * (1 - self.run_error_rate)
+        self.num_run_failures += 1
+        cooldown = min(
+            ENDPOINT_FAILURE_COOLDOWN * 2 ** (self.num_run_failures - 1),
+            ENDPOINT_MAX_FAILURE_COOLDOWN
+        )
+        self.cooldown_until = time.monotonic() + cooldown
+
+
+class EndpointSelector:
+    # Picks the local subtensor for each run.
+    #
+    # Every candidate is probed at the same time with a websocket handshake and a
+    # system_health request. The probes that answer within a short grace period of the
+    # fastest one are counted, and the healthy endpoint with the best rolling score is
+    # used. The scores are kept on the selector so they carry over between iterations
+    # of the loop, along with the results reported from the actual runs. Endpoints in
+    # a cooldown after a failed run are skipped while any other endpoint is healthy.
+    def __init__(self, names=None):
+        self._networks = get_lite_subtensor_networks(names or LOCAL_LITE_SUBTENSORS)
+        self._scores = {network: EndpointScore() for network in self._networks}
+
+    def select(self):
+        return self.select_all()[0]
+
+    def select_all(self):
+        healthy_networks = asyncio.run(self._probe_all())
+        if not healthy_networks:
+            bittensor.logging.error("No local subtensor answered the health probe.")
+            healthy_networks = self._networks
+
+        networks = [n for n in healthy_networks if not self._scores[n].in_cooldown]
+        if not networks:
+            bittensor.logging.warning(
+                "Every healthy subtensor is cooling down after a failure."
+            )
+            networks = healthy_networks
+
+        networks = sorted(networks, key=lambda n: self._scores[n].score)
+        bittensor.logging.info(
+            "Subtensor scores: " + ", ".join(
+                f"{n} ({self._scores[n].latency or 0.0:.3f}s, "
+                f"{self._scores[n].error_rate:.2f} probe errors, "
+                f"{self._scores[n].run_error_rate:.2f} run errors)"
+                for n in networks
+            )
+        )
+        return networks
+
+    def record_success(self, network):
+        if network in self._scores:
+            self._scores[network].add_run_success()
+
+    def record_failure(self, network):
+        if network in self._scores:
+            self._scores[network].add_run_failure()
+
+    async def _probe_all(self):
+        start_time = time.monotonic()
+        tasks = {
+            asyncio.create_task(self._probe(network)): network
+            for network in self._networks
+        }
+        healthy_networks = []
+        pending = set(tasks)
+        deadline = start_time + ENDPOINT_PROBE_TIMEOUT
+
+        while pending:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                network = tasks[task]
+                if task.exception() is None:
+                    self._scores[network].add_latency(task.result())
+                    self._scores[network].add_probe_success()
+                    healthy_networks.append(network)
+                else:
+                    bittensor.logging.warning(
+                        f"Health probe failed on '{network}': {task.exception()}"
+                    )
+                    self._scores[network].add_probe_failure()
+
+            # Once an endpoint has answered only wait a little longer for the rest.
+            if healthy_networks:
+                deadline = min(deadline, time.monotonic() + ENDPOINT_PROBE_GRACE)
+
+        # The endpoints that didn't answer in time are slower than the ones that did.
+        elapsed = time.monotonic() - start_time
+        for task in pending:
+            task.cancel()
+            self._scores[tasks[task]].add_latency(elapsed)
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        return healthy_networks
+
+    @staticmethod
+    async def _probe(network):
+        start_time = time.monotonic()
+        async with websockets.connect(
+            network, open_timeout=ENDPOINT_PROBE_TIMEOUT, close_timeout=1
+        ) as websocket:
+            await websocket.send(
+                json.dumps({"jsonrpc": "2.0", "id": 1, "method": "system_health", "params": []})
+            )
+            response = json.loads(await websocket.recv())
+
+        health = response.get("result")
+        if health is None:
+            raise ConnectionError(f"Bad system_health response: {response}")
+        if health.get("isSyncing"):
+            raise ConnectionError("Subtensor is syncing")
+
+        return time.monotonic() - start_time
@@ -0,0 +1,131 @@
+# standard imports
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+
+# bittensor import
+import bittensor
+
+
+# inotify flags from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0x00000800
+_IN_CLOEXEC = 0x00080000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class FolderWatcher:
+    # Waits for files to be written or moved into a folder.
+    #
+    # inotify is used through libc when it's available so that waiting costs nothing
+    # and wakes up as soon as the file lands. Otherwise the modification times of the
+    # files are polled every poll_interval seconds.
+    def __init__(self, folder, file_names, poll_interval=5):
+        self._folder = folder
+        self._file_names = set(file_names)
+        self._poll_interval = poll_interval
+        self._fd = self._init_inotify()
+        self._mtimes = self._get_mtimes()
+
+        if self._fd is None:
+            bittensor.logging.warning(
+                f"inotify isn't available. Polling {folder} every {poll_interval} seconds."
+            )
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def wait(self, timeout=None):
+        # Returns the names of the watched files that changed, or an empty list if
+        # none did within the timeout.
+        if self._fd is None:
+            return self._poll(timeout)
+
+        end_time = None if timeout is None else time.time() + timeout
+        while True:
+            remaining = None if end_time is None else max(end_time - time.time(), 0)
+            readable, _, _ = select.select([self._fd], [], [], remaining)
+            if not readable:
+                return []
+            changed = self._read_events()
+            if changed:
+                return sorted(changed)
+
+    def _init_inotify(self):
+        libc_name = ctypes.util.find_library("c")
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            inotify_init1 = libc.inotify_init1
+            inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError):
+            return None
+
+        fd = inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return None
+
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if inotify_add_watch(fd, os.fsencode(self._folder), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            bittensor.logging.error(
+                f"Failed to watch {self._folder}: {os.strerror(errno)}"
+            )
+            return None
+
+        return fd
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset+name_len].rstrip(b"\0").decode()
+            offset += name_len
+
+            # Events were dropped so any of the files may have changed.
+            if mask & _IN_Q_OVERFLOW:
+                changed.update(self._file_names)
+            elif name in self._file_names:
+                changed.add(name)
+
+        return changed
+
+    def _get_mtimes(self):
+        mtimes = {}
+        for file_name in self._file_names:
+            try:
+                mtimes[file_name] = os.lstat(os.path.join(self._folder, file_name)).st_mtime_ns
+            except OSError:
+                mtimes[file_name] = None
+        return mtimes
+
+    def _poll(self, timeout):
+        end_time = None if timeout is None else time.time() + timeout
+        while True:
+            mtimes = self._get_mtimes()
+            changed = [f for f in mtimes if mtimes[f] != self._mtimes[f]]
+            self._mtimes = mtimes
+            if changed:
+                return sorted(changed)
+
+            if end_time is not None and time.time() >= end_time:
+                return []
+            sleep_time = self._poll_interval
+            if end_time is not None:
+                sleep_time = min(sleep_time, end_time - time.time())
+            time.sleep(max(sleep_time, 0))
@@ -0,0 +1,193 @@
+# standard imports
+import fcntl
+import json
+import numpy
+import os
+import re
+import tempfile
+
+# bittensor import
+import bittensor
+
+# Local imports
+from .constants import INTERVAL_STORE_FOLDER_NAME
+
+
+# One record per weight setting interval. None values are stored as NaN for the
+# floats and as -1 for the intervals.
+INTERVAL_DTYPE = numpy.dtype([
+    ("block", "<i8"),
+    ("rizzo_emission", "<f8"),
+    ("rizzo_vtrust", "<f8"),
+    ("avg_vtrust", "<f8"),
+    ("rizzo_updated", "<i8"),
+])
+
+
+class IntervalStore:
+    # Append-only weight setting interval history.
+    #
+    # Each (netuid, mechid) has a file of fixed size binary records, oldest first, so
+    # that new intervals are appended to the end of the file rather than rewriting
+    # the whole history and the whole file is read into typed numpy columns with a
+    # single read. The file is compacted down to the last num_intervals records once
+    # it grows to twice that. The per-run subnet values (subnet emission, alpha price
+    # and mech emissions) are kept in a small json file per netuid.
+    def __init__(self, json_folder):
+        self._store_folder = os.path.join(json_folder, INTERVAL_STORE_FOLDER_NAME)
+
+    @property
+    def exists(self):
+        return os.path.isdir(self._store_folder)
+
+    def get_netuids(self):
+        if not self.exists:
+            return []
+
+        meta_file_regex = re.compile(r"^intervals\.(?P<netuid>\d+)\.json$")
+        netuids = []
+        for _file in os.listdir(self._store_folder):
+            regex_match = meta_file_regex.match(_file)
+            if regex_match:
+                netuids.append(int(regex_match.group("netuid")))
+        return sorted(netuids)
+
+    def read_meta(self, netuid):
+        meta_file = self._get_meta_file(netuid)
+        if not os.path.isfile(meta_file):
+            return None
+        with open(meta_file, "r") as fd:
+            return json.load(fd)
+
+    def read(self, netuid, mechid, num_intervals=None):
+        # Returns the intervals as a numpy structured array, latest first.
+        records = self._read_records(self._get_records_file(netuid, mechid))
+        if num_intervals:
+            records = records[-num_intervals:]
+        return records[::-1]
+
+    def get_latest_block(self, netuid, num_mechs):
+        # Returns the latest stored interval block over all mechs, or None if there
+        # are none.
+        latest_block = 0
+        for mechid in range(num_mechs):
+            records_file = self._get_records_file(netuid, mechid)
+            if os.path.isfile(records_file):
+                latest_block = max(latest_block, self._read_last_block(records_file))
+        return latest_block or None
+
+    def update(self, netuid, validator_data, num_intervals):
+        # Appends the intervals in the ValidatorData that are later than the last
+        # stored interval of each mech and writes the per-run subnet values.
+        os.makedirs(self._store_folder, exist_ok=True)
+
+        for mechid, mech_block_data in enumerate(validator_data.mech_block_data):
+            records_file = self._get_records_file(netuid, mechid)
+            with open(records_file, "ab") as fp:
+                fcntl.flock(fp, fcntl.LOCK_EX)
+
+                last_block = self._read_last_block(records_file)
+                new_records = get_records(
+                    [b for b in mech_block_data.blocks if b > last_block],
+                    mech_block_data.block_data,
+                )
+                if len(new_records):
+                    # Append oldest first.
+                    fp.write(new_records[::-1].tobytes())
+                    fp.flush()
+
+                num_records = os.path.getsize(records_file) // INTERVAL_DTYPE.itemsize
+                if num_intervals and num_records >= 2 * num_intervals:
+                    self._compact(records_file, num_intervals)
+
+        self._write_meta(netuid, {
+            "subnet_emission": validator_data.subnet_emission,
+            "subnet_alpha_price": validator_data.subnet_alpha_price,
+            "mech_emissions": [m.mech_emission for m in validator_data.mech_block_data],
+        })
+
+    def _compact(self, records_file, num_intervals):
+        # Rewrite the file with only the last num_intervals records. The caller holds
+        # the lock on the file.
+        records = self._read_records(records_file)[-num_intervals:]
+        bittensor.logging.info(
+            f"Compacting {records_file} to {len(records)} intervals."
+        )
+        self._replace_file(records_file, records.tobytes(), "wb")
+
+    def _write_meta(self, netuid, meta):
+        self._replace_file(self._get_meta_file(netuid), json.dumps(meta), "w")
+
+    def _replace_file(self, file_path, data, mode):
+        fd, temp_file = tempfile.mkstemp(dir=self._store_folder)
+        with os.fdopen(fd, mode) as fp:
+            fp.write(data)
+        os.replace(temp_file, file_path)
+
+    @staticmethod
+    def _read_records(records_file):
+        if not os.path.isfile(records_file):
+            return numpy.zeros(0, dtype=INTERVAL_DTYPE)
+
+        with open(records_file, "rb") as fp:
+            data = fp.read()
+
+        # Ignore a partially written record at the end of the file.
+        num_records = len(data) // INTERVAL_DTYPE.itemsize
+        return numpy.frombuffer(data, dtype=INTERVAL_DTYPE, count=num_records)
+
+    @staticmethod
+    def _read_last_block(records_file):
+        num_records = os.path.getsize(records_file) // INTERVAL_DTYPE.itemsize
+        if not num_records:
+            return 0
+
+        with open(records_file, "rb") as fp:
+            fp.seek((num_records - 1) * INTERVAL_DTYPE.itemsize)
+            last_record = numpy.frombuffer(
+                fp.read(INTERVAL_DTYPE.itemsize), dtype=INTERVAL_DTYPE
+            )
+        return int(last_record[0]["block"])
+
+    def _get_records_file(self, netuid, mechid):
+        return os.path.join(self._store_folder, f"intervals.{netuid}.{mechid}.bin")
+
+    def _get_meta_file(self, netuid):
+        return os.path.join(self._store_folder, f"intervals.{netuid}.json")
+
+
+def get_records(blocks, block_data):
+    # Converts the blocks and the BlockData of a MechBlockData, latest first, into
+    # interval records. Extra block data past the number of blocks is ignored.
+    records = numpy.zeros(len(blocks), dtype=INTERVAL_DTYPE)
+    for i, block in enumerate(blocks):
+        data = block_data[i]
+        records[i] = (
+            block,
+            data.rizzo_emission,
+            data.rizzo_vtrust,
+            numpy.nan if data.avg_vtrust is None else data.avg_vtrust,
+            -1 if data.rizzo_updated is None else data.rizzo_updated,
+        )
+    return records
+
+
+def get_block_data_values(records):
+    # Converts interval records back into the BlockData values, with NaN and -1
+    # turned back into None.
+    avg_vtrusts = records["avg_vtrust"]
+    rizzo_updateds = records["rizzo_updated"]
+    return [
+        {
+            "rizzo_emission": rizzo_emission,
+            "rizzo_vtrust": rizzo_vtrust,
+            "avg_vtrust": avg_vtrust,
+            "rizzo_updated": rizzo_updated,
+        }
+        for rizzo_emission, rizzo_vtrust, avg_vtrust, rizzo_updated in zip(
+            records["rizzo_emission"].tolist(),
+            records["rizzo_vtrust"].tolist(),
+            numpy.where(numpy.isnan(avg_vtrusts), None, avg_vtrusts).tolist(),
+            numpy.where(rizzo_updateds < 0, None, rizzo_updateds).tolist(),
+        )
+    ]
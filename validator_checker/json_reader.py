@@ -0,0 +1,206 @@
+# standard imports
+from collections import OrderedDict
+import gzip
+import os
+import re
+
+# ijson is optional. Without it the projected reads parse the whole file and then
+# drop the other fields, which still keeps the cache small.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Local imports
+from .constants import (
+    JSON_READER_MAX_ENTRIES,
+    MANIFEST_FILE_NAME,
+)
+from .serialization import (
+    load_json,
+    zstandard,
+)
+
+
+class CachedJsonReader:
+    # Reads the json files written by the writers and keeps the parsed content so that
+    # a file is only parsed again once it has changed.
+    #
+    # A file is unchanged when its (mtime, size) is the same as when it was parsed, or
+    # when the manifest in its folder gives it the same hash as a file that was parsed.
+    # The latter catches the unchanged files in a new published version folder. The
+    # manifest is only trusted for files that are older than it, since the writers
+    # move the changed files in before they replace the manifest, and the content
+    # found by its hash is never cached under the file's (mtime, size). Only stat
+    # calls are made for unchanged files.
+    #
+    # The fields arg projects the content down to a single nested key, i.e.
+    # ("*", "validator_hotkeys", "Rizzo") for the Rizzo hotkey of every netuid, keeping
+    # the shape of the content. With ijson installed the file is parsed as a stream and
+    # only the projected values are built.
+    def __init__(self, max_entries=JSON_READER_MAX_ENTRIES):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._manifests = {}
+        self._num_parsed = 0
+
+    @property
+    def num_parsed(self):
+        return self._num_parsed
+
+    def read(self, file_path, fields=None):
+        fields = tuple(fields) if fields else None
+        stat = os.stat(file_path)
+        file_key = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get((file_path, fields))
+        if entry is not None and entry["file_key"] == file_key:
+            self._entries.move_to_end((file_path, fields))
+            return entry["data"]
+
+        file_hash = self._get_manifest_hash(file_path, stat)
+        entry = self._entries.get((file_hash, fields)) if file_hash is not None else None
+        if entry is not None:
+            # The content is only known to match the file through the manifest so the
+            # file's (mtime, size) isn't kept, and the manifest is checked again on the
+            # next read.
+            data = entry["data"]
+            file_key = None
+        elif fields is None:
+            data = load_json(file_path)
+            self._num_parsed += 1
+        else:
+            data = read_projected_json(file_path, fields)
+            self._num_parsed += 1
+
+        entry = {"file_key": file_key, "hash": file_hash, "data": data}
+        self._put((file_path, fields), entry)
+        if file_hash is not None:
+            self._put((file_hash, fields), entry)
+        return data
+
+    def _put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_manifest_hash(self, file_path, file_stat):
+        # Returns the hash of the file in the manifest of its folder if the manifest
+        # has it with the same size and was written after the file.
+        folder, file_name = os.path.split(file_path)
+        manifest_file = os.path.join(folder, MANIFEST_FILE_NAME)
+        try:
+            stat = os.stat(manifest_file)
+        except OSError:
+            return None
+        if stat.st_mtime_ns < file_stat.st_mtime_ns:
+            return None
+
+        manifest_key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._manifests.get(manifest_file)
+        if cached is None or cached[0] != manifest_key:
+            try:
+                cached = (manifest_key, load_json(manifest_file))
+            except (OSError, ValueError):
+                return None
+            self._manifests[manifest_file] = cached
+
+        manifest_entry = cached[1].get(file_name)
+        if not manifest_entry or manifest_entry.get("size") != file_stat.st_size:
+            return None
+        return manifest_entry.get("hash")
+
+
+def project(data, fields):
+    # Returns the data with only the nested key given by fields, where "*" matches
+    # every key of a dict.
+    if not fields:
+        return data
+    if not isinstance(data, dict):
+        return None
+
+    field, other_fields = fields[0], fields[1:]
+    keys = data.keys() if field == "*" else [field] if field in data else []
+    return {key: project(data[key], other_fields) for key in keys}
+
+
+def read_projected_json(file_path, fields):
+    if ijson is None:
+        return project(load_json(file_path), fields)
+
+    try:
+        with _open_json_stream(file_path) as fp:
+            return _parse_projected(fp, fields)
+    except ijson.JSONError:
+        # The json module writes NaN and Infinity, which ijson doesn't read.
+        return project(load_json(file_path), fields)
+
+
+def _open_json_stream(file_path):
+    with open(file_path, "rb") as fp:
+        magic = fp.read(4)
+
+    if magic.startswith(b"\x1f\x8b"):
+        return gzip.open(file_path, "rb")
+    if magic.startswith(b"\x28\xb5\x2f\xfd"):
+        if zstandard is None:
+            raise RuntimeError("The zstandard module is required to read zstd files.")
+        return zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+    return open(file_path, "rb")
+
+
+def _parse_projected(fp, fields):
+    # Builds the projected values from the ijson events, only building the objects
+    # whose prefix matches the fields.
+    fields_regex = re.compile(
+        "^" + r"\.".join("[^.]+" if f == "*" else re.escape(f) for f in fields) + "$"
+    )
+
+    result = {}
+    builder = None
+    depth = 0
+    for prefix, event, value in ijson.parse(fp, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            if depth == 0:
+                _set_nested(result, builder_prefix, builder.value)
+                builder = None
+            continue
+
+        if event in ("map_key", "end_map", "end_array") or not fields_regex.match(prefix):
+            continue
+
+        if event in ("start_map", "start_array"):
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            builder_prefix = prefix
+            depth = 1
+        else:
+            _set_nested(result, prefix, value)
+
+    return result
+
+
+def _set_nested(result, prefix, value):
+    keys = prefix.split(".")
+    for key in keys[:-1]:
+        result = result.setdefault(key, {})
+    result[keys[-1]] = value
+
+
+# The readers in a process share the cache.
+_json_reader = None
+
+
+def get_json_reader():
+    global _json_reader
+
+    if _json_reader is None:
+        _json_reader = CachedJsonReader()
+
+    return _json_reader
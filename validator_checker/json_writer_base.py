@@ -10,12 +10,24 @@ import bittensor
 
 # Local imports
 from .constants import (
+    DAEMON_WORKER_TIMEOUT,
     LOCAL_TIMEZONE,
+    MANIFEST_FILE_NAME,
+    PUBLISH_CURRENT_LINK_NAME,
+    PUBLISH_VERSIONS_FOLDER_NAME,
     TIMESTAMP_FILE_NAME,
 )
+from .endpoint_selector import EndpointSelector
+from .interval_store import IntervalStore
+from .serialization import (
+    JsonSerializer,
+    strip_compression_suffix,
+)
 from .utils import (
+    get_file_hash,
     get_formatted_time,
     get_lite_subtensor_network,
+    read_manifest,
     SubtensorConnectionError,
 )
 
@@ -23,33 +35,148 @@ from .utils import (
 mp_queue = multiprocessing.Queue()
 
 
+def _daemon_worker_main(conn):
+    while True:
+        try:
+            run_func, args = conn.recv()
+        except EOFError:
+            break
+
+        try:
+            run_func(*args)
+        except Exception as err:
+            try:
+                conn.send(err)
+            except Exception:
+                # The exception couldn't be pickled.
+                conn.send(RuntimeError(f"{type(err).__name__}: {err}"))
+        else:
+            conn.send(None)
+
+
+class DaemonWorker:
+    # A single long-lived worker process that runs every iteration of the loop so that
+    # the subtensor connection stays warm between runs. The worker is restarted if it
+    # crashes or doesn't finish within the timeout.
+    def __init__(self, timeout=DAEMON_WORKER_TIMEOUT):
+        self._timeout = timeout
+        self._process = None
+        self._conn = None
+
+    def _start(self):
+        bittensor.logging.info("Starting daemon worker process.")
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_daemon_worker_main, args=(child_conn,), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+    def stop(self):
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join()
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def apply(self, run_func, args):
+        if self._process is not None and not self._process.is_alive():
+            bittensor.logging.error(
+                f"Daemon worker exited with code {self._process.exitcode}. Restarting."
+            )
+            self.stop()
+        if self._process is None:
+            self._start()
+
+        self._conn.send((run_func, args))
+
+        if not self._conn.poll(self._timeout):
+            bittensor.logging.error(
+                f"Daemon worker did not finish within {get_formatted_time(self._timeout)}. "
+                "Restarting."
+            )
+            self.stop()
+            raise SubtensorConnectionError
+
+        try:
+            err = self._conn.recv()
+        except EOFError:
+            bittensor.logging.error("Daemon worker crashed. Restarting.")
+            self.stop()
+            raise SubtensorConnectionError
+
+        if err is not None:
+            raise err
+
+
 class LoopRunnerBase:
     def __init__(self, run_func, options):
         self._run_func = run_func
         self._options = options
+        self._daemon_worker = DaemonWorker() if getattr(options, "daemon", False) else None
+        self._endpoint_selector = EndpointSelector()
 
         bittensor.logging.enable_info()
 
         self._makedirs()
-        self._run_write_json_loop()
+        try:
+            self._run_write_json_loop()
+        finally:
+            if self._daemon_worker:
+                self._daemon_worker.stop()
 
     def _makedirs(self):
         raise NotImplementedError
 
+    def _record_endpoint_result(self, failed):
+        networks = self._options.lite_network
+        if isinstance(networks, str):
+            networks = [networks]
+        for network in networks:
+            if failed:
+                self._endpoint_selector.record_failure(network)
+            else:
+                self._endpoint_selector.record_success(network)
+
     def _run_write_json_loop(self):
+        rotate_network = True
         while True:
             start_time = time.time()
-            self._options.lite_network = get_lite_subtensor_network(self._options.local_lite_subtensor)
+
+            # In daemon mode keep using the same subtensor so that the worker's
+            # connection can be reused. Only rotate after a failure.
+            #
+            # When rotating between the local subtensors, start on the healthy subtensor
+            # that answers the fastest rather than just the next one in the list.
+            if getattr(self._options, "shard", False):
+                self._options.lite_network = self._endpoint_selector.select_all()
+            elif rotate_network:
+                if self._options.local_lite_subtensor is None:
+                    self._options.lite_network = self._endpoint_selector.select()
+                else:
+                    self._options.lite_network = get_lite_subtensor_network(self._options.local_lite_subtensor)
+            rotate_network = not self._daemon_worker
 
             args = [self._options]
             try:
-                with multiprocessing.Pool(processes=1) as pool:
-                    pool.apply(self._run_func, args)
+                if self._daemon_worker:
+                    self._daemon_worker.apply(self._run_func, args)
+                else:
+                    with multiprocessing.Pool(processes=1) as pool:
+                        pool.apply(self._run_func, args)
             except SubtensorConnectionError:
+                self._record_endpoint_result(failed=True)
+                rotate_network = True
                 if self._options.local_lite_subtensor is None:
                     bittensor.logging.error("Rotating subtensors and trying again.")
                     time.sleep(1)
                     continue
+            else:
+                self._record_endpoint_result(failed=False)
             finally:
                 while not mp_queue.empty():
                     tempdirs = mp_queue.get()
@@ -76,6 +203,11 @@ class LoopRunnerBase:
 class JsonWriterBase:
     def __init__(self, options):
             self._lite_network = options.lite_network
+            self._publish_versions = getattr(options, "publish_versions", 0)
+            self._serializer = JsonSerializer(
+                compact=getattr(options, "compact", False),
+                compression=getattr(options, "compression", None),
+            )
             self._run()
 
     def _run(self):
@@ -98,25 +230,118 @@ class JsonWriterBase:
     def _rm_tempdirs(self):
         raise NotImplementedError
 
+    def _get_publish_dir(self, final_dir):
+        # Returns the folder to move the new files into.
+        #
+        # With --publish-versions every run is written to a new version folder under
+        # the final folder, which starts out as hard links to the files of the current
+        # version so that unchanged files are kept as is, and then published by
+        # _publish. Otherwise the files are moved into the final folder itself.
+        if not self._publish_versions:
+            return final_dir
+
+        versions_dir = os.path.join(final_dir, PUBLISH_VERSIONS_FOLDER_NAME)
+        publish_dir = os.path.join(versions_dir, str(time.time_ns()))
+        os.makedirs(publish_dir)
+
+        current_dir = os.path.join(final_dir, PUBLISH_CURRENT_LINK_NAME)
+        if os.path.isdir(current_dir):
+            for file_name in os.listdir(current_dir):
+                file_path = os.path.join(current_dir, file_name)
+                if os.path.isfile(file_path):
+                    os.link(file_path, os.path.join(publish_dir, file_name))
+
+        return publish_dir
+
+    def _publish(self, final_dir, publish_dir):
+        # Point the current link at the new version with a single rename so that
+        # readers either see the whole previous version or the whole new one, then
+        # remove all but the last --publish-versions versions. The previous version is
+        # always kept since a reader may have resolved the link just before the switch.
+        if publish_dir == final_dir:
+            return
+
+        current_link = os.path.join(final_dir, PUBLISH_CURRENT_LINK_NAME)
+        temp_link = f"{current_link}.tmp"
+        if os.path.lexists(temp_link):
+            os.unlink(temp_link)
+        os.symlink(os.path.relpath(publish_dir, final_dir), temp_link)
+        os.replace(temp_link, current_link)
+        bittensor.logging.info(f"Published {publish_dir} as {current_link}")
+
+        versions_dir = os.path.dirname(publish_dir)
+        versions = sorted(
+            (v for v in os.listdir(versions_dir) if v.isdigit()), key=int
+        )
+        for version in versions[:-max(self._publish_versions, 2)]:
+            version_dir = os.path.join(versions_dir, version)
+            bittensor.logging.info(f"Removing {version_dir}")
+            shutil.rmtree(version_dir, ignore_errors=True)
+
     @staticmethod
-    def _move_json_files_to_final_dir(temp_dir, final_dir):
+    def _move_json_files_to_final_dir(temp_dir, final_dir, blocks=None):
+        # Move the new files into the final folder and write the manifest.
+        #
+        # Files whose content hasn't changed are left in place, untouched, rather than
+        # replaced so that readers can skip reloading them. The manifest lists the hash,
+        # block (from blocks, which maps the file names to their block), size and write
+        # time of every file. The write time is when this run wrote the file, even when
+        # it was unchanged, and is what the timestamp file is based on.
+        blocks = blocks or {}
+        old_manifest = read_manifest(final_dir)
+        new_file_names = set(os.listdir(temp_dir))
+
         # Remove old files from final folder
         for file_name in os.listdir(final_dir):
             file_path = os.path.join(final_dir, file_name)
             if (
                 not os.path.isfile(file_path)
-                or os.path.splitext(file_path)[1] != ".json"
+                or os.path.splitext(strip_compression_suffix(file_name))[1] != ".json"
+                or file_name in new_file_names
+                or file_name in (MANIFEST_FILE_NAME, TIMESTAMP_FILE_NAME)
             ):
                 continue
             bittensor.logging.info(f"Removing {file_path}")
             os.unlink(file_path)
 
-        # Copy files from temp folder to final folder
-        for file_name in os.listdir(temp_dir):
+        # Copy changed files from temp folder to final folder
+        manifest = {}
+        for file_name in sorted(new_file_names):
             src_file_path = os.path.join(temp_dir, file_name)
             dest_file_path = os.path.join(final_dir, file_name)
-            bittensor.logging.info(f"Moving {src_file_path} to {dest_file_path}")
-            os.rename(src_file_path, dest_file_path)
+            file_hash = get_file_hash(src_file_path)
+            file_time = os.path.getmtime(src_file_path)
+
+            old_entry = old_manifest.get(file_name)
+            if old_entry and os.path.isfile(dest_file_path):
+                old_hash = (
+                    old_entry["hash"]
+                    if os.path.getsize(dest_file_path) == old_entry["size"] else None
+                )
+            elif os.path.isfile(dest_file_path):
+                old_hash = get_file_hash(dest_file_path)
+            else:
+                old_hash = None
+
+            if file_hash == old_hash:
+                bittensor.logging.info(f"Keeping unchanged {dest_file_path}")
+                os.unlink(src_file_path)
+            else:
+                bittensor.logging.info(f"Moving {src_file_path} to {dest_file_path}")
+                os.rename(src_file_path, dest_file_path)
+
+            manifest[file_name] = {
+                "hash": file_hash,
+                "block": blocks.get(file_name),
+                "size": os.path.getsize(dest_file_path),
+                "time": file_time,
+            }
+
+        manifest_file = os.path.join(final_dir, MANIFEST_FILE_NAME)
+        bittensor.logging.info(f"Writing manifest file: {manifest_file}")
+        with open(f"{manifest_file}.tmp", "w") as fp:
+            json.dump(manifest, fp, indent=4)
+        os.replace(f"{manifest_file}.tmp", manifest_file)
 
     @staticmethod
     def _write_timestamp(
@@ -126,15 +351,18 @@ class JsonWriterBase:
         os.environ["TZ"] = LOCAL_TIMEZONE
         time.tzset()
 
+        # The write times come from the manifest since unchanged files are left with
+        # the modification time of the run that first wrote them.
+        manifest = read_manifest(json_folder)
         min_file_time = 0
         json_base, json_ext = os.path.splitext(data_file_name)
         for _file in os.listdir(json_folder):
-            file_base, file_ext = os.path.splitext(_file)
+            file_base, file_ext = os.path.splitext(strip_compression_suffix(_file))
             if not file_base.startswith(json_base) or file_ext != json_ext:
                 continue
 
             json_file = os.path.join(json_folder, _file)
-            file_time = os.path.getmtime(json_file)
+            file_time = manifest.get(_file, {}).get("time") or os.path.getmtime(json_file)
             if min_file_time == 0 or file_time < min_file_time:
                 min_file_time = file_time
         
@@ -153,7 +381,18 @@ class JsonWriterBase:
         else:
             timestamp = None
 
+        # Replace the file rather than writing over it since it may be hard linked
+        # from the previous published version.
         timestamp_file = os.path.join(json_folder, TIMESTAMP_FILE_NAME)
         bittensor.logging.info(f"Writing timestamp file: {timestamp_file}")
-        with open(timestamp_file, "w") as fp:
+        with open(f"{timestamp_file}.tmp", "w") as fp:
             json.dump(timestamp, fp)
+        os.replace(f"{timestamp_file}.tmp", timestamp_file)
+
+    @staticmethod
+    def _update_interval_store(json_folder, validator_data, num_intervals):
+        interval_store = IntervalStore(json_folder)
+        for netuid in validator_data:
+            bittensor.logging.info(f"Updating interval store for netuid {netuid}")
+            interval_store.update(netuid, validator_data[netuid], num_intervals)
+
@@ -1,5 +1,4 @@
 # standard imports
-import json
 import os
 import shutil
 import tempfile
@@ -9,13 +8,17 @@ import time
 import bittensor
 
 # Local imports
+from .archive_cache import ArchiveCache
 from .constants import DATA_FILE_NAME
 from .json_writer_base import (
     JsonWriterBase,
     LoopRunnerBase,
     mp_queue,
 )
-from .subnet_data_intervals import SubnetDataIntervals
+from .subnet_data_intervals import (
+    get_latest_interval_block,
+    SubnetDataIntervals,
+)
 from .utils import (
     get_formatted_time,
     get_json_file_name,
@@ -26,7 +29,11 @@ from .utils import (
 class LoopRunnerIntervals(LoopRunnerBase):
     def __init__(self, run_func, options):
         options.local_lite_subtensor = False
-        options.archive_network = options.local_archive_subtensor or "archive"
+        # Multiple archive subtensors are used together to shard each run across them.
+        archive_subtensors = options.local_archive_subtensor or ["archive"]
+        options.archive_network = (
+            archive_subtensors if len(archive_subtensors) > 1 else archive_subtensors[0]
+        )
 
         super().__init__(run_func, options)
 
@@ -37,7 +44,12 @@ class LoopRunnerIntervals(LoopRunnerBase):
 class JsonWriterIntervals(JsonWriterBase):
     def __init__(self, options):
         self._archive_network = options.archive_network
-        self._chunk_size = options.chunk_size
+        self._max_concurrency = options.max_concurrency
+        self._speculative_depth = options.speculative_depth
+        self._discover_intervals = options.discover_intervals
+        self._archive_cache = (
+            None if options.no_archive_cache else ArchiveCache(options.archive_cache_folder)
+        )
         self._num_weights_intervals = options.num_weights_intervals
         self._json_folder = options.json_folder
 
@@ -59,8 +71,11 @@ class JsonWriterIntervals(JsonWriterBase):
             subnet_data = SubnetDataIntervals(
                 self._archive_network,
                 self._num_weights_intervals,
-                chunk_size=self._chunk_size,
-                existing_json_data_folder=self._json_folder
+                max_concurrency=self._max_concurrency,
+                existing_json_data_folder=self._json_folder,
+                speculative_depth=self._speculative_depth,
+                discover_intervals=self._discover_intervals,
+                archive_cache=self._archive_cache,
             )
         except Exception as err:
             bittensor.logging.error(f"Subtensor connection failed on '{self._lite_network}'")
@@ -69,13 +84,19 @@ class JsonWriterIntervals(JsonWriterBase):
 
         validator_data = subnet_data.as_dict
         netuids = subnet_data.netuids
+        self._validator_data = subnet_data.validator_data
+        self._blocks = {}
 
         for netuid in netuids:
-            json_file_name = get_json_file_name(DATA_FILE_NAME, netuid)
+            json_file_name = self._serializer.get_file_name(
+                get_json_file_name(DATA_FILE_NAME, netuid)
+            )
             write_json_file = os.path.join(self._tempdir, json_file_name)
             bittensor.logging.info(f"Writing data to file: {write_json_file}")
-            with open(write_json_file, "w") as fp:
-                json.dump({netuid: validator_data[netuid]}, fp, indent=4)
+            self._serializer.dump({netuid: validator_data[netuid]}, write_json_file)
+            self._blocks[json_file_name] = get_latest_interval_block(
+                self._validator_data[netuid]
+            )
 
         total_time = round(time.time() - start_time)
         bittensor.logging.info(
@@ -85,8 +106,15 @@ class JsonWriterIntervals(JsonWriterBase):
 
     def _mv_tmp_to_final(self):
         # Move files over to final location and write timestamp.
-        self._move_json_files_to_final_dir(self._tempdir, self._json_folder)
-        self._write_timestamp(self._json_folder, DATA_FILE_NAME)
+        publish_dir = self._get_publish_dir(self._json_folder)
+        self._move_json_files_to_final_dir(self._tempdir, publish_dir, self._blocks)
+        self._write_timestamp(publish_dir, DATA_FILE_NAME)
+        self._publish(self._json_folder, publish_dir)
+
+        # Append the new intervals to the interval store.
+        self._update_interval_store(
+            self._json_folder, self._validator_data, self._num_weights_intervals
+        )
 
     def _rm_tempdirs(self):
         # Remove temp folders
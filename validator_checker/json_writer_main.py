@@ -2,6 +2,7 @@
 import json
 import os
 import shutil
+import sqlite3
 import tempfile
 import time
 
@@ -9,14 +10,25 @@ import time
 import bittensor
 
 # Local imports
-from .constants import DATA_FILE_NAME
+from .constants import (
+    DATA_FILE_NAME,
+    REGISTERED_SUBNETS_FILE_NAME,
+)
 from .json_writer_base import (
     JsonWriterBase,
     LoopRunnerBase,
     mp_queue,
 )
+from .persistent_subtensor import (
+    close_persistent_subtensor,
+    get_persistent_subtensor,
+)
+from .snapshot_db import SnapshotDB
 from .subnet_data_main import SubnetDataMain
-from .subnet_data_intervals import SubnetDataIntervalsFromMainData
+from .subnet_data_intervals import (
+    get_latest_interval_block,
+    SubnetDataIntervalsFromMainData,
+)
 from .utils import (
     get_formatted_time,
     get_json_file_name,
@@ -33,10 +45,13 @@ class LoopRunnerMain(LoopRunnerBase):
 
 class JsonWriterMain(JsonWriterBase):
     def __init__(self, options):
-        self._chunk_size = options.chunk_size
+        self._max_concurrency = options.max_concurrency
+        self._fetch_mode = options.fetch_mode
+        self._daemon = options.daemon
         self._num_weights_intervals = options.num_weights_intervals
         self._json_main_folder = options.json_main_folder
         self._json_intervals_folder = options.json_intervals_folder
+        self._history_db = options.history_db
 
         super().__init__(options)
 
@@ -58,45 +73,88 @@ class JsonWriterMain(JsonWriterBase):
         # Gather subnet data.
         # This assumes that there are no bugs in SubnetDataMain and
         # any exceptions raised are due to subtensor connection errors.
+        #
+        # In daemon mode the subtensor connection is kept open in this worker process
+        # across runs. It's closed on failure so that the next run reconnects.
+        persistent_subtensor = (
+            get_persistent_subtensor(self._lite_network)
+            if self._daemon and isinstance(self._lite_network, str) else None
+        )
         try:
             subnet_data = SubnetDataMain(
                 self._lite_network,
-                chunk_size=self._chunk_size,
+                max_concurrency=self._max_concurrency,
+                fetch_mode=self._fetch_mode,
+                persistent_subtensor=persistent_subtensor,
             )
         except Exception as err:
             bittensor.logging.error(f"Subtensor connection failed on '{self._lite_network}'")
             bittensor.logging.error(f"{type(err).__name__}: {err}")
+            if persistent_subtensor:
+                close_persistent_subtensor()
             raise SubtensorConnectionError
 
         validator_data_main = subnet_data.as_dict
         netuids = subnet_data.netuids
+        self._validator_data_main = subnet_data.validator_data
 
         # Write main data json file
         netuid_range = f"{netuids[0]}-{netuids[-1]}"        
-        json_file_name_main = get_json_file_name(DATA_FILE_NAME, netuid_range)
+        json_file_name_main = self._serializer.get_file_name(
+            get_json_file_name(DATA_FILE_NAME, netuid_range)
+        )
         json_file_main = os.path.join(self._tempdir_main, json_file_name_main)
 
         bittensor.logging.info(f"Writing main data to file: {json_file_main}")
-        with open(json_file_main, "w") as fp:
-            json.dump(validator_data_main, fp, indent=4)
+        self._serializer.dump(validator_data_main, json_file_main)
+        block = max(d.block for d in self._validator_data_main.values())
+        self._blocks_main = {json_file_name_main: block}
+
+        # Write the registered subnets for the deregistration monitor so that it
+        # doesn't have to gather the same subnet data again.
+        registered_subnets_file = os.path.join(
+            self._tempdir_main, REGISTERED_SUBNETS_FILE_NAME
+        )
+        bittensor.logging.info(f"Writing registered subnets to file: {registered_subnets_file}")
+        with open(registered_subnets_file, "w") as fp:
+            json.dump(
+                {
+                    "block": block,
+                    "time": int(time.time()),
+                    # The subnets that were actually gathered, so that the
+                    # monitor only checks the registration on those.
+                    "netuids": sorted(self._validator_data_main),
+                    "registered": subnet_data.registered_netuids,
+                },
+                fp, indent=4
+            )
+        self._blocks_main[REGISTERED_SUBNETS_FILE_NAME] = block
 
         # If the --json-intervals-folder was specified then gather the intervals from
         # the existing json files and add interval blocks as necessary.
         if self._json_intervals_folder:
-            validator_data_intervals = SubnetDataIntervalsFromMainData(
+            subnet_data_intervals = SubnetDataIntervalsFromMainData(
                 netuids, validator_data_main, self._json_intervals_folder,
                 num_intervals=self._num_weights_intervals
-            ).as_dict
+            )
+            validator_data_intervals = subnet_data_intervals.as_dict
+            self._validator_data_intervals = subnet_data_intervals.validator_data
+            self._blocks_intervals = {}
 
             for netuid in netuids:
-                json_file_name_intervals = \
+                json_file_name_intervals = self._serializer.get_file_name(
                     get_json_file_name(DATA_FILE_NAME, netuid)
+                )
                 json_file_intervals = os.path.join(
                     self._tempdir_intervals, json_file_name_intervals)
                 bittensor.logging.info(f"Writing intervals data for netuid {netuid} to file: "
                       f"{json_file_intervals}")
-                with open(json_file_intervals, "w") as fp:
-                    json.dump({netuid: validator_data_intervals[netuid]}, fp, indent=4)
+                self._serializer.dump(
+                    {netuid: validator_data_intervals[netuid]}, json_file_intervals
+                )
+                self._blocks_intervals[json_file_name_intervals] = get_latest_interval_block(
+                    self._validator_data_intervals[netuid]
+                )
 
         total_time = round(time.time() - start_time)
         bittensor.logging.info(
@@ -105,12 +163,42 @@ class JsonWriterMain(JsonWriterBase):
 
     def _mv_tmp_to_final(self):
         # Move files over to final location and write timestamp.
-        self._move_json_files_to_final_dir(self._tempdir_main, self._json_main_folder)
-        self._write_timestamp(self._json_main_folder, DATA_FILE_NAME)
+        publish_dir_main = self._get_publish_dir(self._json_main_folder)
+        self._move_json_files_to_final_dir(
+            self._tempdir_main, publish_dir_main, self._blocks_main
+        )
+        self._write_timestamp(publish_dir_main, DATA_FILE_NAME)
+        self._publish(self._json_main_folder, publish_dir_main)
 
         if self._json_intervals_folder:
-            self._move_json_files_to_final_dir(self._tempdir_intervals, self._json_intervals_folder)
-            self._write_timestamp(self._json_intervals_folder, DATA_FILE_NAME)
+            publish_dir_intervals = self._get_publish_dir(self._json_intervals_folder)
+            self._move_json_files_to_final_dir(
+                self._tempdir_intervals, publish_dir_intervals, self._blocks_intervals
+            )
+            self._write_timestamp(publish_dir_intervals, DATA_FILE_NAME)
+            self._publish(self._json_intervals_folder, publish_dir_intervals)
+
+            # Append the new intervals to the interval store.
+            self._update_interval_store(
+                self._json_intervals_folder, self._validator_data_intervals,
+                self._num_weights_intervals
+            )
+
+        # Add the snapshot to the history database once everything is published. The
+        # history is only a side output so a failure (i.e. a locked database) is
+        # logged rather than stopping the writer.
+        if self._history_db:
+            try:
+                snapshot_db = SnapshotDB(self._history_db)
+                try:
+                    snapshot_db.ingest(self._validator_data_main)
+                finally:
+                    snapshot_db.close()
+            except sqlite3.Error as err:
+                bittensor.logging.error(
+                    f"Failed to add the snapshot to {self._history_db}: "
+                    f"{type(err).__name__}: {err}"
+                )
 
     def _rm_tempdirs(self):
         # Remove temp folders
@@ -1,6 +1,5 @@
 # standard imports
 from dataclasses import dataclass, asdict
-import json
 import os
 import requests
 import shutil
@@ -63,12 +62,13 @@ class JsonWriterPrice(JsonWriterBase):
 
         netuids = sorted(subnet_data)
         netuid_range = f"{netuids[0]}-{netuids[-1]}"
-        json_file_name = get_json_file_name(SUBNET_PRICE_FILE_NAME, netuid_range)
+        json_file_name = self._serializer.get_file_name(
+            get_json_file_name(SUBNET_PRICE_FILE_NAME, netuid_range)
+        )
         json_file = os.path.join(self._tempdir, json_file_name)
 
         bittensor.logging.info(f"Writing data to file: {json_file}")
-        with open(json_file, "w") as fd:
-            json.dump(data_dict, fd, indent=4)
+        self._serializer.dump(data_dict, json_file)
 
         total_time = round(time.time() - start_time)
         bittensor.logging.info(
@@ -77,8 +77,10 @@ class JsonWriterPrice(JsonWriterBase):
 
     def _mv_tmp_to_final(self):
         # Move files over to final location and write timestamp.
-        self._move_json_files_to_final_dir(self._tempdir, self._json_folder)
-        self._write_timestamp(self._json_folder, SUBNET_PRICE_FILE_NAME, write_actual_time=False)
+        publish_dir = self._get_publish_dir(self._json_folder)
+        self._move_json_files_to_final_dir(self._tempdir, publish_dir)
+        self._write_timestamp(publish_dir, SUBNET_PRICE_FILE_NAME, write_actual_time=False)
+        self._publish(self._json_folder, publish_dir)
 
     def _rm_tempdirs(self):
         # Remove temp folders
@@ -0,0 +1,108 @@
+# standard imports
+import struct
+
+# bittensor import
+import bittensor
+
+# Local imports
+from .constants import (
+    GLOBAL_MAX_SUBNET_COUNT,
+    LAST_UPDATE_RANGE_BLOCKS,
+    LAST_UPDATE_RANGES_PER_BATCH,
+)
+
+
+class LastUpdateHistory:
+    # Finds the blocks at which a uid set weights from the changes to the LastUpdate
+    # storage over a block range.
+    #
+    # The archive node returns every change to a storage key between two blocks with a
+    # single state_queryStorage request. The value stored for a uid is the block at
+    # which it last set weights, so the distinct values that the uid takes over the
+    # range are its weight setting blocks. The range is split into windows so that
+    # each response stays small and the windows are requested in parallel.
+    def __init__(self, subtensor, scheduler):
+        self._subtensor = subtensor
+        self._scheduler = scheduler
+
+    async def get_weight_set_blocks(self, netuid, mechid, uid, to_block, from_block, num_blocks):
+        # Returns up to num_blocks weight setting blocks for the uid, latest first,
+        # going back from to_block but not before from_block.
+        substrate = self._subtensor.substrate
+        storage_key = await substrate.create_storage_key(
+            "SubtensorModule", "LastUpdate", [get_storage_index(netuid, mechid)]
+        )
+        storage_key = storage_key.to_hex()
+
+        weight_set_blocks = set()
+        end_block = to_block
+        while end_block > from_block and len(weight_set_blocks) < num_blocks:
+            windows = []
+            for _ in range(LAST_UPDATE_RANGES_PER_BATCH):
+                start_block = max(end_block - LAST_UPDATE_RANGE_BLOCKS, from_block)
+                windows.append((start_block, end_block))
+                end_block = start_block
+                if end_block <= from_block:
+                    break
+
+            results = await self._scheduler.gather(
+                *[
+                    self._get_values_in_range(storage_key, uid, start_block, end_block)
+                    for start_block, end_block in windows
+                ]
+            )
+            for values in results:
+                weight_set_blocks.update(values)
+
+        # A value of 0 means the uid has never set weights.
+        weight_set_blocks.discard(0)
+        return sorted(weight_set_blocks, reverse=True)[:num_blocks]
+
+    async def _get_values_in_range(self, storage_key, uid, start_block, end_block):
+        substrate = self._subtensor.substrate
+        start_hash = await substrate.get_block_hash(start_block)
+        end_hash = await substrate.get_block_hash(end_block)
+        response = await substrate.rpc_request(
+            "state_queryStorage", [[storage_key], start_hash, end_hash]
+        )
+
+        # The first change set holds the value at the start of the range and each
+        # of the others holds the new value at a block where it changed.
+        values = set()
+        for change_set in response.get("result") or []:
+            for _, data in change_set["changes"]:
+                if data is None:
+                    continue
+                last_update = decode_u64_vec(data)
+                if uid < len(last_update):
+                    values.add(last_update[uid])
+        return values
+
+
+def get_storage_index(netuid, mechid):
+    # The per mechanism storages are keyed by a single index that combines the
+    # netuid and the mechid.
+    return mechid * GLOBAL_MAX_SUBNET_COUNT + netuid
+
+
+def decode_u64_vec(data):
+    # Decodes a SCALE encoded Vec<u64> from a hex string.
+    data = bytes.fromhex(data[2:] if data.startswith("0x") else data)
+
+    # The length is a compact integer. Its lowest two bits give the encoding mode.
+    mode = data[0] & 0b11
+    if mode == 0:
+        length, offset = data[0] >> 2, 1
+    elif mode == 1:
+        length, offset = int.from_bytes(data[:2], "little") >> 2, 2
+    elif mode == 2:
+        length, offset = int.from_bytes(data[:4], "little") >> 2, 4
+    else:
+        num_bytes = (data[0] >> 2) + 4
+        length, offset = int.from_bytes(data[1:1+num_bytes], "little"), 1 + num_bytes
+
+    if len(data) < offset + 8 * length:
+        bittensor.logging.warning("Truncated LastUpdate value.")
+        length = (len(data) - offset) // 8
+
+    return list(struct.unpack_from(f"<{length}Q", data, offset))
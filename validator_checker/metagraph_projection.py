@@ -0,0 +1,143 @@
+# Future imports
+from __future__ import annotations
+
+# bittensor import
+import bittensor
+from bittensor.core.chain_data import SelectiveMetagraphIndex
+
+# standart imports
+import asyncio
+from dataclasses import dataclass
+import numpy
+
+
+# The metagraph_info fields read by SubnetDataMain._populate_validator_data_for_subnet.
+# Validator trust isn't part of the metagraph_info so it's read from the ValidatorTrust
+# storage instead.
+PROJECTION_INDICES = [
+    SelectiveMetagraphIndex.Hotkeys,
+    SelectiveMetagraphIndex.Coldkeys,
+    SelectiveMetagraphIndex.ValidatorPermit,
+    SelectiveMetagraphIndex.LastUpdate,
+    SelectiveMetagraphIndex.Emission,
+    SelectiveMetagraphIndex.TotalStake,
+    SelectiveMetagraphIndex.TaoIn,
+    SelectiveMetagraphIndex.AlphaIn,
+    SelectiveMetagraphIndex.TaoInEmission,
+]
+
+# Only the last_update attribute is read from the metagraph_info of mechs 1+.
+MECH_PROJECTION_INDICES = [
+    SelectiveMetagraphIndex.LastUpdate,
+]
+
+
+# A compact stand-in for bittensor.Metagraph that only holds the fields that the
+# validator data is built from. The attribute names match the metagraph so the two
+# can be used interchangeably.
+@dataclass
+class MetagraphProjection:
+    netuid: int
+    hotkeys: list[str]
+    coldkeys: list[str]
+    validator_permit: numpy.ndarray
+    last_update: numpy.ndarray
+    Tv: numpy.ndarray
+    E: numpy.ndarray
+    S: numpy.ndarray
+    pool: MetagraphProjection.Pool
+    emissions: MetagraphProjection.Emissions
+
+    @dataclass
+    class Pool:
+        tao_in: float
+        alpha_in: float
+
+    @dataclass
+    class Emissions:
+        tao_in_emission: float
+
+    @property
+    def uids(self):
+        return numpy.arange(len(self.hotkeys))
+
+    @classmethod
+    def from_metagraph_info(cls, netuid, metagraph_info, validator_trust):
+        num_uids = len(metagraph_info.hotkeys)
+
+        # ValidatorTrust can be shorter than the number of uids right after a
+        # registration so pad it out to match the rest of the columns.
+        vtrust = numpy.zeros(num_uids, dtype=float)
+        vtrust_values = [bittensor.u16_normalized_float(v) for v in validator_trust or []]
+        vtrust[:min(num_uids, len(vtrust_values))] = vtrust_values[:num_uids]
+
+        return cls(
+            netuid=netuid,
+            hotkeys=list(metagraph_info.hotkeys),
+            coldkeys=list(metagraph_info.coldkeys),
+            validator_permit=numpy.array(metagraph_info.validator_permit, dtype=bool),
+            last_update=numpy.array(metagraph_info.last_update, dtype=int),
+            Tv=vtrust,
+            E=numpy.array([e.tao for e in metagraph_info.emission], dtype=float),
+            S=numpy.array([s.tao for s in metagraph_info.total_stake], dtype=float),
+            pool=cls.Pool(
+                tao_in=metagraph_info.tao_in.tao,
+                alpha_in=metagraph_info.alpha_in.tao,
+            ),
+            emissions=cls.Emissions(
+                tao_in_emission=metagraph_info.tao_in_emission.tao,
+            ),
+        )
+
+
+async def get_metagraph_projection(subtensor, netuid, block):
+    metagraph_info, validator_trust = await asyncio.gather(
+        subtensor.get_metagraph_info(
+            netuid, selected_indices=PROJECTION_INDICES, block=block
+        ),
+        subtensor.query_subtensor("ValidatorTrust", params=[netuid], block=block),
+    )
+    return MetagraphProjection.from_metagraph_info(
+        netuid, metagraph_info, validator_trust.value
+    )
+
+
+async def get_mech_metagraph_projection(subtensor, netuid, block, mechid):
+    return await subtensor.get_metagraph_info(
+        netuid, mechid=mechid, selected_indices=MECH_PROJECTION_INDICES, block=block
+    )
+
+
+async def get_all_metagraph_infos(subtensor, block):
+    # Gets the metagraph info of every subnet with a single runtime API call. Returns
+    # a dictionary keyed by netuid, or None when the bulk call isn't available on the
+    # subtensor or fails so that the caller can fall back to per-subnet calls.
+    try:
+        metagraph_infos = await subtensor.get_all_metagraphs_info(block=block)
+    except Exception as err:
+        bittensor.logging.warning(
+            f"Bulk metagraph info request failed, falling back to per-subnet requests: "
+            f"{type(err).__name__}: {err}"
+        )
+        return None
+
+    return {m.netuid: m for m in metagraph_infos or [] if m is not None}
+
+
+async def get_all_metagraph_projections(netuids, metagraph_infos, storage_reader):
+    # Bulk version of get_metagraph_projection, built from the metagraph infos of
+    # get_all_metagraph_infos. The ValidatorTrust of every subnet is read with the same
+    # multi-key storage reader used for the other bulk reads.
+    validator_trusts = await storage_reader.query(
+        "ValidatorTrust", [[netuid] for netuid in netuids]
+    )
+
+    # Subnets that are missing from the bulk response, or whose ValidatorTrust read
+    # failed, are left out so they're fetched on their own.
+    return {
+        netuid: MetagraphProjection.from_metagraph_info(
+            netuid, metagraph_infos[netuid], validator_trust
+        )
+        for netuid, validator_trust in zip(netuids, validator_trusts)
+        if netuid in metagraph_infos and not isinstance(validator_trust, Exception)
+    }
@@ -0,0 +1,234 @@
+# standard imports
+import asyncio
+import threading
+
+# Third party imports
+import aiohttp
+
+# bittensor import
+import bittensor
+
+# Local imports
+from .constants import (
+    NOTIFY_CLOSE_TIMEOUT,
+    NOTIFY_COALESCE_DELAY,
+    NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_MAX_MESSAGE_LENGTH,
+    NOTIFY_REQUEST_TIMEOUT,
+    NOTIFY_RETRY_BASE_DELAY,
+    NOTIFY_RETRY_MAX_DELAY,
+)
+
+
+class NotificationDispatcher:
+    # Sends messages to a discord style webhook in the background.
+    #
+    # notify only queues the message, so the checks never wait on the webhook. The
+    # messages are sent from an event loop in a daemon thread over a single pooled
+    # http session. Messages queued within coalesce_delay of each other are sent
+    # together as one message with the prefix (i.e. the users to mention) only once.
+    # A 429 response is retried after the time that the webhook asks for, and
+    # connection errors and 5xx responses with an exponential backoff.
+    def __init__(
+            self, url, prefix="", coalesce_delay=NOTIFY_COALESCE_DELAY,
+            max_attempts=NOTIFY_MAX_ATTEMPTS
+    ):
+        self._url = url
+        self._prefix = prefix
+        self._coalesce_delay = coalesce_delay
+        self._max_attempts = max_attempts
+        self._num_sent = 0
+        self._num_failed = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._queue = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    @property
+    def url(self):
+        return self._url
+
+    @property
+    def is_running(self):
+        return self._thread.is_alive()
+
+    @property
+    def num_sent(self):
+        return self._num_sent
+
+    @property
+    def num_failed(self):
+        return self._num_failed
+
+    def notify(self, message):
+        # Can be called from any thread or event loop. Returns whether the message was
+        # queued, which it isn't if the dispatcher has stopped.
+        bittensor.logging.info(f"Queueing notification: {message}")
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, message)
+        except RuntimeError:
+            bittensor.logging.error(
+                f"The notification dispatcher isn't running. Dropping: {message}"
+            )
+            self._num_failed += 1
+            return False
+        return True
+
+    def close(self, timeout=NOTIFY_CLOSE_TIMEOUT):
+        # Sends the pending messages and stops the thread.
+        if not self._thread.is_alive():
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+        except RuntimeError:
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            bittensor.logging.error(
+                f"Pending notifications weren't sent within {timeout} seconds."
+            )
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._dispatch())
+        except Exception as err:
+            bittensor.logging.error(
+                f"The notification dispatcher stopped: {type(err).__name__}: {err}"
+            )
+        finally:
+            self._ready.set()
+            self._loop.close()
+
+    async def _dispatch(self):
+        self._queue = asyncio.Queue()
+        timeout = aiohttp.ClientTimeout(total=NOTIFY_REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            self._ready.set()
+
+            closing = False
+            while not closing:
+                message = await self._queue.get()
+                if message is None:
+                    break
+
+                # Wait for more messages to send along with this one.
+                messages = [message]
+                await asyncio.sleep(self._coalesce_delay)
+                while not self._queue.empty():
+                    message = self._queue.get_nowait()
+                    if message is None:
+                        closing = True
+                    else:
+                        messages.append(message)
+
+                # An unexpected error only loses the message that it happened on
+                # rather than stopping the dispatcher.
+                for content in self._get_contents(messages):
+                    try:
+                        sent = await self._send(session, content)
+                    except Exception as err:
+                        bittensor.logging.error(
+                            f"Failed to send notification: {type(err).__name__}: {err}"
+                        )
+                        sent = False
+                    if sent:
+                        self._num_sent += 1
+                    else:
+                        self._num_failed += 1
+
+    def _get_contents(self, messages):
+        # Joins the messages into as few contents as fit in the message length.
+        max_length = NOTIFY_MAX_MESSAGE_LENGTH - len(self._prefix)
+        contents = []
+        content = ""
+        for message in messages:
+            message = message[:max_length]
+            if content and len(content) + 1 + len(message) > max_length:
+                contents.append(self._prefix + content)
+                content = ""
+            content = f"{content}\n{message}" if content else message
+        if content:
+            contents.append(self._prefix + content)
+        return contents
+
+    async def _send(self, session, content):
+        for attempt in range(self._max_attempts):
+            retry_delay = min(
+                NOTIFY_RETRY_BASE_DELAY * 2 ** attempt, NOTIFY_RETRY_MAX_DELAY
+            )
+            try:
+                async with session.post(self._url, json={"content": content}) as response:
+                    if response.status < 300:
+                        bittensor.logging.info("Discord monitor notification successfully sent.")
+                        return True
+
+                    if response.status == 429:
+                        retry_delay = await get_retry_after(response) or retry_delay
+                        reason = "rate limited"
+                    elif response.status >= 500:
+                        reason = f"failed with status {response.status}"
+                    else:
+                        body = await response.text()
+                        bittensor.logging.error(
+                            f"Notification rejected with status {response.status}: {body}"
+                        )
+                        return False
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                reason = f"failed with {type(err).__name__}: {err}"
+
+            if attempt + 1 < self._max_attempts:
+                bittensor.logging.warning(
+                    f"Notification {reason}. Retrying in {retry_delay:.3} seconds."
+                )
+                await asyncio.sleep(retry_delay)
+            else:
+                bittensor.logging.warning(f"Notification {reason}.")
+
+        bittensor.logging.error(
+            f"Failed to send discord monitor notification after {self._max_attempts} attempts."
+        )
+        return False
+
+
+async def get_retry_after(response):
+    # Discord gives the delay in seconds in the Retry-After header and as a float in
+    # the retry_after field of the body.
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        pass
+    try:
+        return float((await response.json(content_type=None))["retry_after"])
+    except (KeyError, TypeError, ValueError, aiohttp.ClientError):
+        return None
+
+
+# There is only ever one dispatcher per process.
+_notification_dispatcher = None
+
+
+def get_notification_dispatcher(url, prefix=""):
+    global _notification_dispatcher
+
+    # Replace a dispatcher that has stopped rather than queueing messages on it.
+    if _notification_dispatcher is not None and (
+        _notification_dispatcher.url != url or not _notification_dispatcher.is_running
+    ):
+        close_notification_dispatcher()
+
+    if _notification_dispatcher is None:
+        _notification_dispatcher = NotificationDispatcher(url, prefix)
+
+    return _notification_dispatcher
+
+
+def close_notification_dispatcher():
+    global _notification_dispatcher
+
+    if _notification_dispatcher is not None:
+        _notification_dispatcher.close()
+        _notification_dispatcher = None
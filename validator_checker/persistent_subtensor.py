@@ -0,0 +1,70 @@
+# standard imports
+import asyncio
+
+# bittensor import
+import bittensor
+
+# Local imports
+from .runtime_cache import get_async_subtensor
+
+
+class PersistentSubtensor:
+    # Keeps a single AsyncSubtensor connection, and the event loop that it's bound to,
+    # open across runs so the websocket and the runtime metadata are only set up once.
+    def __init__(self, network):
+        self._network = network
+        self._loop = asyncio.new_event_loop()
+        self._subtensor = None
+
+    @property
+    def network(self):
+        return self._network
+
+    def run(self, coro_func):
+        return self._loop.run_until_complete(self._run(coro_func))
+
+    async def _run(self, coro_func):
+        if self._subtensor is None:
+            bittensor.logging.info(f"Connecting to subtensor network: {self._network}")
+            subtensor = get_async_subtensor(self._network)
+            await subtensor.initialize()
+            self._subtensor = subtensor
+        else:
+            bittensor.logging.info(f"Reusing subtensor connection: {self._network}")
+
+        return await coro_func(self._subtensor)
+
+    def close(self):
+        if self._subtensor is not None:
+            try:
+                self._loop.run_until_complete(self._subtensor.close())
+            except Exception as err:
+                bittensor.logging.warning(
+                    f"Failed to close subtensor connection on '{self._network}': {err}"
+                )
+            self._subtensor = None
+        self._loop.close()
+
+
+# There is only ever one persistent subtensor per process.
+_persistent_subtensor = None
+
+
+def get_persistent_subtensor(network):
+    global _persistent_subtensor
+
+    if _persistent_subtensor is not None and _persistent_subtensor.network != network:
+        close_persistent_subtensor()
+
+    if _persistent_subtensor is None:
+        _persistent_subtensor = PersistentSubtensor(network)
+
+    return _persistent_subtensor
+
+
+def close_persistent_subtensor():
+    global _persistent_subtensor
+
+    if _persistent_subtensor is not None:
+        _persistent_subtensor.close()
+        _persistent_subtensor = None
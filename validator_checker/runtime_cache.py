@@ -0,0 +1,61 @@
+# bittensor import
+import bittensor
+from bittensor.core.settings import TYPE_REGISTRY
+from bittensor.utils import SS58_FORMAT
+
+# The disk cached substrate interface is only available in the newer versions
+# of async_substrate_interface.
+try:
+    from async_substrate_interface.async_substrate import (
+        DiskCachedAsyncSubstrateInterface,
+    )
+except ImportError:
+    DiskCachedAsyncSubstrateInterface = None
+
+
+class DiskCachedAsyncSubtensor(bittensor.AsyncSubtensor):
+    # An AsyncSubtensor whose substrate interface keeps the runtime metadata on disk.
+    #
+    # The interface is chosen in the _get_substrate hook that the AsyncSubtensor
+    # constructor calls, with the same arguments that it would pass to the regular
+    # interface, so nothing else about the connection changes. The retrying substrate
+    # interface that's used with fallback endpoints is left alone.
+    def _get_substrate(
+            self, fallback_endpoints=None, retry_forever=False, _mock=False,
+            archive_endpoints=None, ws_shutdown_timer=5.0
+    ):
+        if (
+            DiskCachedAsyncSubstrateInterface is None
+            or fallback_endpoints or retry_forever or archive_endpoints
+        ):
+            return super()._get_substrate(
+                fallback_endpoints=fallback_endpoints,
+                retry_forever=retry_forever,
+                _mock=_mock,
+                archive_endpoints=archive_endpoints,
+                ws_shutdown_timer=ws_shutdown_timer,
+            )
+
+        return DiskCachedAsyncSubstrateInterface(
+            url=self.chain_endpoint,
+            ss58_format=SS58_FORMAT,
+            type_registry=TYPE_REGISTRY,
+            use_remote_preset=True,
+            chain_name="Bittensor",
+            _mock=_mock,
+            ws_shutdown_timer=ws_shutdown_timer,
+        )
+
+
+def get_async_subtensor(network):
+    # Returns an AsyncSubtensor that keeps the runtime metadata on disk.
+    #
+    # Building the runtime (downloading the metadata and type registry and parsing
+    # them) is the bulk of the startup time of every connection, and the archive
+    # walks have to build one for every spec version that they cross. The disk cached
+    # substrate interface stores the parsed runtime of each spec version and the
+    # block to block hash mapping in a sqlite database
+    # (~/.cache/async-substrate-interface by default) when the connection is closed
+    # and loads them back when the next one is opened, so they're shared by all of
+    # the writers and CLIs. Set NO_CACHE=1 to turn it off.
+    return DiskCachedAsyncSubtensor(network=network)
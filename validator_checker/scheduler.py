@@ -0,0 +1,149 @@
+# standard imports
+import asyncio
+import random
+import time
+
+# bittensor import
+import bittensor
+
+# Local imports
+from .constants import (
+    DEFAULT_MAX_CONCURRENCY,
+    MIN_CONCURRENCY,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+)
+
+
+class AdaptiveScheduler:
+    # Limits the number of in-flight subtensor requests across all subnets.
+    #
+    # The limit is adjusted from the observed latency and error rate. It starts small
+    # and doubles every round trip until the first sign of congestion. After that it
+    # grows by roughly one request per round trip while the latency is stable. It's
+    # cut back when the short term latency climbs well above the long term latency
+    # (the node is queueing requests) or when requests fail.
+    _short_latency_weight = 0.3
+    _long_latency_weight = 0.02
+    _error_rate_weight = 0.1
+    _congestion_ratio = 2.0
+    _latency_backoff = 0.75
+    _error_backoff = 0.5
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, min_concurrency=MIN_CONCURRENCY):
+        self._max_concurrency = max(max_concurrency, 1)
+        self._min_concurrency = min(min_concurrency, self._max_concurrency)
+        self._limit = float(self._min_concurrency)
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+        self._short_latency = None
+        self._long_latency = None
+        self._error_rate = 0.0
+        self._last_backoff = 0.0
+        self._slow_start = True
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    @property
+    def error_rate(self):
+        return self._error_rate
+
+    async def gather(self, *coros, return_exceptions=False):
+        return await asyncio.gather(
+            *[self.run(coro) for coro in coros],
+            return_exceptions=return_exceptions
+        )
+
+    async def gather_retry(self, *calls):
+        # Each call is a (key, coro_func) tuple where key describes the call in the log
+        # (i.e. (netuid, "metagraph")) and coro_func takes no arguments. Failed calls are
+        # retried on their own, without holding up or refetching the calls that succeeded.
+        # The exception is returned in place of the result if every attempt fails.
+        return await asyncio.gather(
+            *[self.call_retry(key, coro_func) for key, coro_func in calls],
+            return_exceptions=True
+        )
+
+    async def call_retry(self, key, coro_func, max_attempts=RETRY_MAX_ATTEMPTS):
+        for attempt in range(1, max_attempts+1):
+            try:
+                return await self.run(coro_func())
+            except Exception as err:
+                if attempt == max_attempts:
+                    bittensor.logging.error(
+                        f"{key}: failed after {max_attempts} attempts: "
+                        f"{type(err).__name__}: {err}"
+                    )
+                    raise
+
+                # Exponential backoff with jitter so that the retries of calls that
+                # failed together don't all hit the subtensor at the same time again.
+                delay = min(RETRY_BASE_DELAY * 2 ** (attempt - 1), RETRY_MAX_DELAY)
+                delay *= random.uniform(0.5, 1.5)
+                bittensor.logging.warning(
+                    f"{key}: attempt {attempt} failed ({type(err).__name__}: {err}). "
+                    f"Retrying in {delay:.1f} seconds."
+                )
+                await asyncio.sleep(delay)
+
+    async def run(self, coro):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self._limit))
+            self._in_flight += 1
+
+        start_time = time.monotonic()
+        try:
+            result = await coro
+        except Exception:
+            self._on_error()
+            raise
+        else:
+            self._on_success(time.monotonic() - start_time)
+            return result
+        finally:
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+
+    def _on_success(self, latency):
+        self._error_rate *= (1 - self._error_rate_weight)
+
+        if self._short_latency is None:
+            self._short_latency = self._long_latency = latency
+            return
+
+        self._short_latency += self._short_latency_weight * (latency - self._short_latency)
+        self._long_latency += self._long_latency_weight * (latency - self._long_latency)
+
+        if self._short_latency > self._congestion_ratio * self._long_latency:
+            self._backoff(self._latency_backoff, "latency increased")
+        elif self._slow_start:
+            self._limit = min(self._limit + 1, self._max_concurrency)
+        else:
+            # Additive increase: roughly one extra request per full window of requests.
+            self._limit = min(self._limit + 1 / self._limit, self._max_concurrency)
+
+    def _on_error(self):
+        self._error_rate += self._error_rate_weight * (1 - self._error_rate)
+        self._backoff(self._error_backoff, "request failed")
+
+    def _backoff(self, factor, reason):
+        # Only back off once per round trip so that a burst of slow or failed
+        # requests that were all in flight at the same time only counts once.
+        self._slow_start = False
+
+        now = time.monotonic()
+        if now - self._last_backoff < (self._short_latency or 0.0):
+            return
+        self._last_backoff = now
+
+        limit = max(self._limit * factor, self._min_concurrency)
+        if int(limit) < int(self._limit):
+            bittensor.logging.debug(
+                f"Reducing concurrency from {int(self._limit)} to {int(limit)}: {reason} "
+                f"(error rate {self._error_rate:.2f})."
+            )
+        self._limit = limit
@@ -0,0 +1,151 @@
+# standard imports
+import gzip
+import json
+import math
+import numpy
+import os
+
+# orjson and zstandard are optional. orjson is only used for the compact format
+# since it can't indent by 4 like the pretty printed files always have been.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class JsonSerializer:
+    # Writes the json files of the writers.
+    #
+    # By default the files are pretty printed with the standard json module like they
+    # always have been. In compact mode the whitespace is left out and orjson is used
+    # when it's installed. orjson writes NaN and Infinity as null while the json module
+    # writes NaN and Infinity, so data that holds them (i.e. a NaN vtrust) is always
+    # written with the json module to keep the values the same whatever the backend
+    # or format. The files can also be compressed with gzip or zstd, in which case the
+    # compression suffix is added to the file name (i.e. validator_data.1.json.gz).
+    # The readers use load_json, which decompresses the files transparently. The
+    # backend ('json' or 'orjson') can also be forced.
+    def __init__(self, compact=False, compression=None, backend=None):
+        if backend is None:
+            backend = "orjson" if compact and orjson is not None else "json"
+        if backend == "orjson" and orjson is None:
+            raise RuntimeError("The orjson module is required for the orjson backend.")
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown compression: '{compression}'")
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("The zstandard module is required for zstd compression.")
+
+        self._compact = compact
+        self._compression = compression
+        self._backend = backend
+
+    def get_file_name(self, file_name):
+        return file_name + COMPRESSION_SUFFIXES.get(self._compression, "")
+
+    def dumps(self, data):
+        # Returns the serialized data as bytes.
+        if self._backend == "orjson" and not has_non_finite_floats(data):
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+            if not self._compact:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(data, option=option)
+            except TypeError:
+                # Fall back for the types that orjson doesn't handle (i.e. big ints).
+                pass
+
+        if self._compact:
+            return json.dumps(data, separators=(",", ":")).encode()
+        return json.dumps(data, indent=4).encode()
+
+    def compress(self, data):
+        if self._compression == "gzip":
+            return gzip.compress(data, compresslevel=6, mtime=0)
+        if self._compression == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return data
+
+    def dump(self, data, file_path):
+        # The file name should come from get_file_name.
+        with open(file_path, "wb") as fp:
+            fp.write(self.compress(self.dumps(data)))
+
+
+def has_non_finite_floats(data):
+    # Returns whether any float in the data is NaN or infinite.
+    values = [data]
+    while values:
+        value = values.pop()
+        if isinstance(value, dict):
+            values.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            values.extend(value)
+        elif isinstance(value, (float, numpy.floating)):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, numpy.ndarray) and value.dtype.kind in "fc":
+            if not numpy.isfinite(value).all():
+                return True
+    return False
+
+
+def decompress(data):
+    # Detects the compression from the magic bytes rather than the file name so that
+    # any json file can be read no matter how it was written.
+    if data.startswith(_GZIP_MAGIC):
+        return gzip.decompress(data)
+    if data.startswith(_ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("The zstandard module is required to read zstd files.")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    return data
+
+
+def load_json(file_path, backend=None):
+    with open(file_path, "rb") as fp:
+        return loads(fp.read(), backend)
+
+
+def loads(data, backend=None):
+    # Decompresses and parses the data, with orjson when it's installed unless the
+    # json backend is asked for.
+    data = decompress(data)
+    if orjson is not None and backend != "json":
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # The json module writes NaN and Infinity, which orjson doesn't read.
+            pass
+    return json.loads(data)
+
+
+def strip_compression_suffix(file_name):
+    # Returns the file name without the compression suffix (i.e. validator_data.1.json
+    # for validator_data.1.json.gz).
+    for suffix in COMPRESSION_SUFFIXES.values():
+        if file_name.endswith(suffix):
+            return file_name[:-len(suffix)]
+    return file_name
+
+
+def find_json_file(file_path):
+    # Returns the path of the json file, which may have been written compressed, or
+    # None if it doesn't exist.
+    for suffix in ["", *COMPRESSION_SUFFIXES.values()]:
+        if os.path.isfile(file_path + suffix):
+            return file_path + suffix
+    return None
@@ -0,0 +1,176 @@
+# standard imports
+from dataclasses import fields
+import os
+import sqlite3
+import time
+
+# bittensor import
+import bittensor
+
+# Local imports
+from .constants import (
+    SNAPSHOT_HOURLY_RETENTION,
+    SNAPSHOT_RAW_RETENTION,
+)
+
+
+class SnapshotDB:
+    # Time series history of the SubnetDataMain validator data in a sqlite database.
+    #
+    # Every numeric field of each subnet's ValidatorData is stored as one row per
+    # snapshot in the raw tier. Fields that hold a value per mech (i.e. rizzo_updated)
+    # are stored as one field per mech (i.e. rizzo_updated.0). Each ingest rolls the
+    # complete hours of raw data up into hourly averages and the complete days of
+    # hourly data up into daily averages, then drops the raw and hourly data that's
+    # older than its retention so that the database only grows by the daily tier.
+    _tiers = {
+        "raw": None,
+        "hourly": 3600,
+        "daily": 86400,
+    }
+
+    def __init__(self, db_file):
+        db_folder = os.path.dirname(os.path.abspath(db_file))
+        os.makedirs(db_folder, exist_ok=True)
+
+        self._connection = sqlite3.connect(db_file, timeout=30)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                tier TEXT NOT NULL,
+                netuid INTEGER NOT NULL,
+                field TEXT NOT NULL,
+                time INTEGER NOT NULL,
+                block INTEGER NOT NULL,
+                value REAL NOT NULL,
+                num_samples INTEGER NOT NULL,
+                PRIMARY KEY (tier, netuid, field, time)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS rollups (
+                tier TEXT PRIMARY KEY,
+                time INTEGER NOT NULL
+            );
+            """
+        )
+
+    def close(self):
+        self._connection.close()
+
+    def ingest(self, validator_data, snapshot_time=None):
+        # Adds a snapshot of the validator data of all subnets, where validator_data
+        # maps the netuids to SubnetDataMain.ValidatorData.
+        snapshot_time = int(snapshot_time or time.time())
+        rows = [
+            ("raw", netuid, field, snapshot_time, data.block, value, 1)
+            for netuid, data in validator_data.items()
+            for field, value in get_numeric_fields(data)
+        ]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._rollup("hourly", "raw", snapshot_time)
+            self._rollup("daily", "hourly", snapshot_time)
+            self._prune("raw", snapshot_time - SNAPSHOT_RAW_RETENTION)
+            self._prune("hourly", snapshot_time - SNAPSHOT_HOURLY_RETENTION)
+
+        bittensor.logging.info(f"Added {len(rows)} values to the snapshot database.")
+
+    def query(self, netuid, field, start_time=None, end_time=None, tier=None):
+        # Returns (time, block, value) tuples for the field of the netuid. When the
+        # tier isn't given the most detailed tier that still covers the start time is
+        # used, or without a start time the most detailed tier that has data (so that
+        # the latest values show up before they're rolled up into the other tiers).
+        end_time = end_time or int(time.time())
+        if tier is None:
+            tier = (
+                self._get_tier(start_time) if start_time
+                else self._get_detailed_tier(netuid, field)
+            )
+        start_time = start_time or 0
+
+        return self._connection.execute(
+            """
+            SELECT time, block, value FROM snapshots
+            WHERE tier = ? AND netuid = ? AND field = ? AND time >= ? AND time <= ?
+            ORDER BY time
+            """,
+            (tier, netuid, field, start_time, end_time),
+        ).fetchall()
+
+    def get_fields(self, netuid):
+        return [
+            row[0] for row in self._connection.execute(
+                "SELECT DISTINCT field FROM snapshots WHERE netuid = ? ORDER BY field",
+                (netuid,),
+            )
+        ]
+
+    def _get_detailed_tier(self, netuid, field):
+        for tier in self._tiers:
+            row = self._connection.execute(
+                """
+                SELECT 1 FROM snapshots WHERE tier = ? AND netuid = ? AND field = ?
+                LIMIT 1
+                """,
+                (tier, netuid, field),
+            ).fetchone()
+            if row is not None:
+                return tier
+        return "raw"
+
+    def _get_tier(self, start_time):
+        age = time.time() - start_time
+        if age <= SNAPSHOT_RAW_RETENTION:
+            return "raw"
+        if age <= SNAPSHOT_HOURLY_RETENTION:
+            return "hourly"
+        return "daily"
+
+    def _rollup(self, tier, source_tier, snapshot_time):
+        # Average the source tier rows of each complete period since the last rollup
+        # into one row per period. The averages are weighted by the number of
+        # samples so that the daily values are the averages of all raw samples.
+        period = self._tiers[tier]
+        end_time = snapshot_time // period * period
+        row = self._connection.execute(
+            "SELECT time FROM rollups WHERE tier = ?", (tier,)
+        ).fetchone()
+        start_time = row[0] if row else 0
+        if start_time >= end_time:
+            return
+
+        self._connection.execute(
+            f"""
+            INSERT OR REPLACE INTO snapshots
+            SELECT ?, netuid, field, time / {period} * {period}, MAX(block),
+                SUM(value * num_samples) / SUM(num_samples), SUM(num_samples)
+            FROM snapshots
+            WHERE tier = ? AND time >= ? AND time < ?
+            GROUP BY netuid, field, time / {period}
+            """,
+            (tier, source_tier, start_time, end_time),
+        )
+        self._connection.execute(
+            "INSERT OR REPLACE INTO rollups VALUES (?, ?)", (tier, end_time)
+        )
+
+    def _prune(self, tier, before_time):
+        self._connection.execute(
+            "DELETE FROM snapshots WHERE tier = ? AND time < ?", (tier, before_time)
+        )
+
+
+def get_numeric_fields(validator_data):
+    # Yields (field, value) for the numeric fields of the ValidatorData with one
+    # field per element for the lists of numbers. None values are skipped.
+    for field in fields(validator_data):
+        value = getattr(validator_data, field.name)
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)):
+            yield field.name, float(value)
+        elif isinstance(value, list):
+            for i, element in enumerate(value):
+                if isinstance(element, (int, float)) and not isinstance(element, bool):
+                    yield f"{field.name}.{i}", float(element)
@@ -0,0 +1,102 @@
+# standard imports
+import asyncio
+from functools import partial
+
+# bittensor import
+import bittensor
+from bittensor.utils import SS58_FORMAT
+from scalecodec.utils.ss58 import ss58_encode
+
+# Local imports
+from .constants import STORAGE_BATCH_SIZE
+
+
+class BulkStorageReader:
+    # Reads many keys of a SubtensorModule storage at a pinned block with a few
+    # multi-key state_queryStorageAt requests rather than one request per key.
+    def __init__(self, subtensor, scheduler, block, batch_size=STORAGE_BATCH_SIZE):
+        self._subtensor = subtensor
+        self._scheduler = scheduler
+        self._block = block
+        self._batch_size = batch_size
+        self._block_hash = None
+
+    async def _get_block_hash(self):
+        if self._block_hash is None:
+            self._block_hash = await self._subtensor.substrate.get_block_hash(self._block)
+        return self._block_hash
+
+    async def query(self, storage_function, params_list, module="SubtensorModule"):
+        # Returns the values in the same order as params_list. If a batch still fails
+        # after its retries then its exception is returned for each of its keys.
+        if not params_list:
+            return []
+
+        block_hash = await self._get_block_hash()
+        batches = [
+            params_list[i:i+self._batch_size]
+            for i in range(0, len(params_list), self._batch_size)
+        ]
+        results = await self._scheduler.gather_retry(
+            *[
+                (
+                    (storage_function, f"batch {bi+1} of {len(batches)}"),
+                    partial(self._query_batch, module, storage_function, batch, block_hash)
+                )
+                for bi, batch in enumerate(batches)
+            ]
+        )
+
+        values = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                values.extend([result] * len(batch))
+            else:
+                values.extend(result)
+        return values
+
+    async def _query_batch(self, module, storage_function, batch, block_hash):
+        substrate = self._subtensor.substrate
+        storage_keys = await asyncio.gather(
+            *[
+                substrate.create_storage_key(
+                    module, storage_function, params, block_hash=block_hash
+                )
+                for params in batch
+            ]
+        )
+        results = await substrate.query_multi(storage_keys, block_hash=block_hash)
+
+        # Match the results back up with the keys rather than relying on the order
+        # that the node returned them in.
+        values_by_key = {
+            storage_key.to_hex(): get_storage_value(value)
+            for storage_key, value in results
+        }
+        return [values_by_key.get(storage_key.to_hex()) for storage_key in storage_keys]
+
+
+def get_storage_value(value):
+    # Depending on the substrate interface version the values are either
+    # ScaleObj instances or already plain python values.
+    return getattr(value, "value", value)
+
+
+def get_ss58_address(account_id):
+    # Account ids come back as ss58 strings or as the raw account id bytes (a tuple of
+    # ints, sometimes wrapped in another tuple) depending on how the substrate
+    # interface decoded them, which is why get_children decodes them too.
+    if isinstance(account_id, str):
+        return account_id
+    if len(account_id) == 1 and isinstance(account_id[0], (tuple, list, bytes)):
+        account_id = account_id[0]
+    return ss58_encode(bytes(account_id).hex(), SS58_FORMAT)
+
+
+def get_child_hotkeys(children):
+    # Converts the (proportion, child) pairs of the ChildKeys and PendingChildKeys
+    # storages into the (proportion, hotkey) format that get_children returns.
+    return [
+        (bittensor.u64_normalized_float(proportion), get_ss58_address(child))
+        for proportion, child in children
+    ]
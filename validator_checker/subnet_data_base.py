@@ -5,6 +5,9 @@ from __future__ import annotations
 import bittensor
 
 # standart imports
+import asyncio
+import contextlib
+import contextvars
 from dataclasses import asdict
 
 # Local imports
@@ -12,7 +15,18 @@ from .constants import (
     COLDKEYS,
     MULTI_UID_HOTKEYS,
     RIZZO_HOTKEYS,
+    SHARD_BATCH_SIZE,
+    SHARD_MAX_ATTEMPTS,
+    SHARD_MAX_FAILURES,
 )
+from .runtime_cache import get_async_subtensor
+from .scheduler import AdaptiveScheduler
+
+
+# The request scheduler for the subtensor that the current task is using. It's a
+# context variable so that each subtensor gets its own scheduler when a run is
+# sharded across multiple subtensors.
+_scheduler_context = contextvars.ContextVar("scheduler")
 
 
 class SubnetDataBase:
@@ -42,6 +56,12 @@ class SubnetDataBase:
 
 
 class SubnetDataFromSubtensor(SubnetDataBase):
+    _persistent_subtensor = None
+
+    @property
+    def _scheduler(self):
+        return _scheduler_context.get()
+
     @staticmethod
     def _get_other_coldkey(other_coldkey):
         if not other_coldkey:
@@ -98,50 +118,186 @@ class SubnetDataFromSubtensor(SubnetDataBase):
     def _get_subnet_alpha_price(metagraph):
         return metagraph.pool.tao_in / metagraph.pool.alpha_in
 
-    async def _async_get_subnet_data(self):
-        def get_chunks():
-            num_netuids = len(self._netuids)
-            netuid_start = 0
-            while True:
-                netuid_end = netuid_start + self._chunk_size
-                if netuid_end >= num_netuids:
-                    yield self._netuids[netuid_start:]
-                    break
-                else:
-                    yield self._netuids[netuid_start:netuid_end]
-                    netuid_start = netuid_end
+    def _run_async_get_subnet_data(self):
+        # Spread the subnets across all subtensors when given a list of networks.
+        # Use the persistent subtensor connection when running as a daemon.
+        # Otherwise open a new connection just for this run.
+        if isinstance(self._network, (list, tuple)):
+            asyncio.run(self._async_get_sharded_subnet_data())
+        elif self._persistent_subtensor:
+            self._persistent_subtensor.run(self._async_get_subnet_data_from_subtensor)
+        else:
+            asyncio.run(self._async_get_subnet_data())
 
+    async def _async_get_subnet_data(self):
         bittensor.logging.info(f"Connecting to subtensor network: {self._network}")
 
-        async with bittensor.AsyncSubtensor(network=self._network) as subtensor:
+        async with get_async_subtensor(self._network) as subtensor:
+            await self._async_get_subnet_data_from_subtensor(subtensor)
+
+    async def _async_get_subnet_data_from_subtensor(self, subtensor):
+        # If netuids arg was not passed in, get all netuids from the subtensor here.
+        if not self._netuids:
+            all_subnets = await subtensor.get_all_subnets_netuid()
+            self._netuids = all_subnets[1:]
+
+        # All requests for all subnets go through the scheduler which limits the number
+        # of requests in flight rather than gathering the subnets in fixed size chunks.
+        _scheduler_context.set(AdaptiveScheduler(max_concurrency=self._max_concurrency))
+        bittensor.logging.info(
+            f"Gathering data with up to {self._max_concurrency} concurrent requests"
+        )
+
+        netuids = self._netuids[:]
+        max_attempts = 5
+        for attempt in range(1, max_attempts+1):
+            bittensor.logging.info(f"Attempt {attempt} of {max_attempts}")
+            await self._get_validator_data(subtensor, netuids)
+
+            # Get netuids missing data
+            # I don't think this is needed anymore but keeping it around
+            # just in case.
+            netuids = list(set(netuids).difference(set(self._validator_data)))
+            if netuids:
+                bittensor.logging.error(
+                    "Failed to gather data for subnets: "
+                    f"{', '.join([str(n) for n in netuids])}."
+                )
+            else:
+                break
+
+        self._drop_failed_netuids()
+
+    async def _async_get_sharded_subnet_data(self):
+        async with contextlib.AsyncExitStack() as stack:
+            subtensors = await self._connect_to_shards(stack)
+            if not subtensors:
+                raise ConnectionError(f"Failed to connect to any of: {self._network}")
+
             # If netuids arg was not passed in, get all netuids from the subtensor here.
             if not self._netuids:
-                all_subnets = await subtensor.get_all_subnets_netuid()
+                all_subnets = await next(iter(subtensors.values())).get_all_subnets_netuid()
                 self._netuids = all_subnets[1:]
 
-            # If chunk_size is 0, get chunk_size after we know that we have the list of netuids.
-            if not self._chunk_size:
-                self._chunk_size = len(self._netuids)
-
-            bittensor.logging.info(f"Gathering data in chunks of {self._chunk_size}")
-
-            max_attempts = 5
-            for netuids in get_chunks():
-                for attempt in range(1, max_attempts+1):
-                    bittensor.logging.info(f"Attempt {attempt} of {max_attempts}")
-                    await self._get_validator_data(subtensor, netuids)
-
-                    # Get netuids missing data
-                    # I don't think this is needed anymore but keeping it around
-                    # just in case.
-                    netuids = list(set(netuids).difference(set(self._validator_data)))
-                    if netuids:
-                        bittensor.logging.error(
-                            "Failed to gather data for subnets: "
-                            f"{', '.join([str(n) for n in netuids])}."
-                        )
-                    else:
-                        break
+            # Pin every shard to the oldest current block so that the data is in sync and
+            # every subtensor has the state for that block.
+            block = min(
+                await asyncio.gather(*[subtensor.block for subtensor in subtensors.values()])
+            )
+            bittensor.logging.info(
+                f"Gathering data at block {block} from {len(subtensors)} subtensors."
+            )
+
+            # The subnets are handed out in small batches from a shared queue. A fast
+            # subtensor takes more batches than a slow one, and a batch that fails on one
+            # subtensor is put back in the queue for another subtensor to pick up.
+            queue = asyncio.Queue()
+            for i in range(0, len(self._netuids), SHARD_BATCH_SIZE):
+                queue.put_nowait((self._netuids[i:i+SHARD_BATCH_SIZE], 1, None))
+
+            active_networks = set(subtensors)
+            workers = [
+                asyncio.create_task(
+                    self._run_shard_worker(network, subtensor, queue, block, active_networks)
+                )
+                for network, subtensor in subtensors.items()
+            ]
+            queue_done = asyncio.create_task(queue.join())
+            workers_done = asyncio.gather(*workers, return_exceptions=True)
+            await asyncio.wait([queue_done, workers_done], return_when=asyncio.FIRST_COMPLETED)
+
+            queue_done.cancel()
+            for worker in workers:
+                worker.cancel()
+            await workers_done
+
+        self._drop_failed_netuids()
+
+    def _drop_failed_netuids(self):
+        # A subnet that still failed after the last attempt is left out of the netuids
+        # so that the netuids are always the subnets that have data. The run only fails
+        # when no subnet could be gathered.
+        failed_netuids = sorted(set(self._netuids).difference(self._validator_data))
+        if not failed_netuids:
+            return
+
+        bittensor.logging.error(
+            "Dropping the subnets that failed to gather: "
+            f"{', '.join([str(n) for n in failed_netuids])}."
+        )
+        self._netuids = [n for n in self._netuids if n in self._validator_data]
+        if not self._netuids:
+            raise ConnectionError("Failed to gather data for any subnet.")
+
+    async def _connect_to_shards(self, stack):
+        async def connect(network):
+            bittensor.logging.info(f"Connecting to subtensor network: {network}")
+            subtensor = get_async_subtensor(network)
+            await subtensor.initialize()
+            return subtensor
+
+        subtensors = {}
+        results = await asyncio.gather(
+            *[connect(network) for network in self._network], return_exceptions=True
+        )
+        for network, result in zip(self._network, results):
+            if isinstance(result, Exception):
+                bittensor.logging.error(
+                    f"Subtensor connection failed on '{network}': "
+                    f"{type(result).__name__}: {result}"
+                )
+                continue
+            stack.push_async_callback(result.close)
+            subtensors[network] = result
+
+        return subtensors
+
+    async def _run_shard_worker(self, network, subtensor, queue, block, active_networks):
+        # Each subtensor gets its own scheduler so the number of requests in flight is
+        # adjusted to how that subtensor is responding.
+        _scheduler_context.set(AdaptiveScheduler(max_concurrency=self._max_concurrency))
+
+        num_failures = 0
+        while True:
+            netuids, attempt, failed_network = await queue.get()
+            try:
+                # Leave batches that just failed on this subtensor to the other ones.
+                if failed_network == network and len(active_networks) > 1:
+                    queue.put_nowait((netuids, attempt, failed_network))
+                    await asyncio.sleep(0.1)
+                    continue
+
+                bittensor.logging.info(f"Gathering subnets {netuids} from '{network}'.")
+                try:
+                    await self._get_validator_data(subtensor, netuids, block=block)
+                except Exception as err:
+                    bittensor.logging.error(
+                        f"Failed to gather subnets {netuids} from '{network}': "
+                        f"{type(err).__name__}: {err}"
+                    )
+
+                missing_netuids = [n for n in netuids if n not in self._validator_data]
+                if not missing_netuids:
+                    num_failures = 0
+                    continue
+
+                num_failures += 1
+                if attempt < SHARD_MAX_ATTEMPTS:
+                    queue.put_nowait((missing_netuids, attempt + 1, network))
+                else:
+                    bittensor.logging.error(
+                        f"Giving up on subnets {missing_netuids} after {attempt} attempts."
+                    )
+            finally:
+                queue.task_done()
+
+            # Stop sending work to a subtensor that keeps failing.
+            if num_failures >= SHARD_MAX_FAILURES and len(active_networks) > 1:
+                bittensor.logging.error(
+                    f"Removing '{network}' after {num_failures} failed batches in a row."
+                )
+                active_networks.discard(network)
+                return
 
     async def _get_validator_data(self, *args, **kwargs):
         raise NotImplementedError
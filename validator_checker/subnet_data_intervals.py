@@ -7,6 +7,8 @@ import bittensor
 # standart imports
 import asyncio
 from dataclasses import dataclass
+from functools import partial
+import hashlib
 import json
 import numpy
 import os
@@ -15,17 +17,43 @@ import time
 
 # Local imports
 from .constants import (
+    ARCHIVE_CACHE_FINALITY_BLOCKS,
+    COLDKEYS,
+    DEFAULT_MAX_CONCURRENCY,
+    LAST_UPDATE_LOOKBACK_TEMPOS,
+    LAST_UPDATE_MAX_LOOKBACK_BLOCKS,
     MIN_VTRUST_THRESHOLD,
     MAX_U_THRESHOLD,
+    MULTI_UID_HOTKEYS,
     DATA_FILE_NAME,
+    RIZZO_HOTKEYS,
+)
+from .interval_store import IntervalStore, get_block_data_values
+from .json_reader import get_json_reader
+from .last_update_history import LastUpdateHistory
+from .serialization import (
+    find_json_file,
+    strip_compression_suffix,
 )
 from .subnet_data_base import SubnetDataBase, SubnetDataFromSubtensor
 from .utils import (
     get_formatted_time,
     get_json_file_name,
+    get_published_folder,
+    read_manifest,
 )
 
 
+# The archive cache entries of the interval inputs are only valid for the settings that
+# they were computed with.
+_INTERVAL_INPUTS_SETTINGS_HASH = hashlib.sha256(
+    json.dumps(
+        [MIN_VTRUST_THRESHOLD, MAX_U_THRESHOLD, RIZZO_HOTKEYS, MULTI_UID_HOTKEYS],
+        sort_keys=True
+    ).encode()
+).hexdigest()[:16]
+
+
 class SubnetDataIntervalsBase:
     @dataclass
     class ValidatorData:
@@ -48,15 +76,88 @@ class SubnetDataIntervalsBase:
         rizzo_updated: int | None
 
 
+class IntervalPrefetcher:
+    # Fetches the metagraph data for the interval walk ahead of time.
+    #
+    # The walk can only learn the previous weight setting block from the metagraph at
+    # the current one, so each interval is another archive round trip. Validators
+    # usually set weights on a steady cadence though, so the earlier weight setting
+    # blocks are predicted from the most recent interval and fetched in parallel. The
+    # walk then picks up the prefetched data when the actual block matches a
+    # prediction and fetches the block on its own when it doesn't. Predictions that
+    # are behind the actual walk are cancelled as soon as they're known to be wrong.
+    def __init__(self, fetch_func, scheduler, depth):
+        self._fetch_func = fetch_func
+        self._scheduler = scheduler
+        self._depth = depth
+        self._tasks = {}
+        self._num_prefetched = 0
+        self._num_used = 0
+
+    def prefetch(self, netuid, weight_set_block, interval, block_to_stop, num_intervals):
+        # Prefetch the data just before the known weight setting block and just before
+        # the predicted ones, without going past the block the walk stops at.
+        if not self._depth or not interval or interval <= 0:
+            return
+
+        predicted_blocks = []
+        for k in range(min(self._depth + 1, num_intervals)):
+            predicted_block = weight_set_block - k * interval
+            if predicted_block <= block_to_stop:
+                break
+            predicted_blocks.append(predicted_block)
+        self.prefetch_blocks(netuid, predicted_blocks)
+
+    def prefetch_blocks(self, netuid, weight_set_blocks):
+        # Prefetch the data just before each of the given weight setting blocks.
+        for weight_set_block in weight_set_blocks:
+            key = (netuid, weight_set_block - 1)
+            if key not in self._tasks:
+                self._tasks[key] = asyncio.create_task(
+                    self._scheduler.run(self._fetch_func(*key))
+                )
+                self._num_prefetched += 1
+
+    async def get(self, netuid, block):
+        # The walk only goes backwards so any prediction for this subnet that's later
+        # than the actual block was wrong.
+        for key in [k for k in self._tasks if k[0] == netuid and k[1] > block]:
+            self._tasks.pop(key).cancel()
+
+        task = self._tasks.pop((netuid, block), None)
+        if task is None:
+            return await self._scheduler.run(self._fetch_func(netuid, block))
+
+        self._num_used += 1
+        return await task
+
+    async def close(self):
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
+
+        if self._num_prefetched:
+            bittensor.logging.info(
+                f"Used {self._num_used} of {self._num_prefetched} prefetched intervals."
+            )
+
+
 class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
     def __init__(
-            self, network, num_intervals, netuids=None, chunk_size=0,
-            other_coldkey=None, existing_json_data_folder=None
+            self, network, num_intervals, netuids=None,
+            max_concurrency=DEFAULT_MAX_CONCURRENCY, other_coldkey=None,
+            existing_json_data_folder=None, speculative_depth=0, discover_intervals=False,
+            archive_cache=None
     ):
         self._netuids = netuids
         self._network = network
-        self._chunk_size = chunk_size
+        self._max_concurrency = max_concurrency
         self._num_intervals = num_intervals
+        self._speculative_depth = speculative_depth
+        self._discover_intervals = discover_intervals
+        self._archive_cache = archive_cache
+        self._genesis_hash = None
         self._other_coldkey = self._get_other_coldkey(other_coldkey)
         self._existing_json_data_folder = existing_json_data_folder
 
@@ -64,7 +165,7 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
 
     def _get_subnet_data(self):
         self._get_existing_subnet_data_from_json()
-        asyncio.run(self._async_get_subnet_data())
+        self._run_async_get_subnet_data()
 
     def _get_existing_subnet_data_from_json(self):
         if self._existing_json_data_folder:
@@ -74,15 +175,16 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
         else:
             self._existing_data = {}
 
-    async def _get_validator_data(self, subtensor, all_netuids):
+    async def _get_validator_data(self, subtensor, all_netuids, block=None):
         start_time = time.time()
         bittensor.logging.info(f"Obtaining data for subnets: {all_netuids}")
 
         # Get the block to pass to async calls so everything is in sync
-        block = await subtensor.block
+        if block is None:
+            block = await subtensor.block
 
         # Get the metagraphs.
-        metagraphs = await asyncio.gather(
+        metagraphs = await self._scheduler.gather(
             *[
                 subtensor.metagraph(netuid, block=block)
                 for netuid in all_netuids
@@ -90,7 +192,7 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
         )
 
         # Get mechanisms for each netuid
-        mech_splits = await asyncio.gather(
+        mech_splits = await self._scheduler.gather(
             *[
                 subtensor.get_mechanism_emission_split(netuid, block=block)
                 for netuid in all_netuids
@@ -135,21 +237,31 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
                 mechid_data["netuids"].append(netuid)
                 mechid_data["metagraphs"].append(metagraph)
 
-        # Loop through each mechid and gather the blocks info for all netuids with that mechid.
-        for mechid, mechid_data in mechids_data.items():
-            netuids = mechid_data["netuids"]
-            metagraphs = mechid_data["metagraphs"]
-            await self._get_validator_data_for_mechid(subtensor, block, mechid, netuids, metagraphs)
+        # Gather the blocks info for all mechids at once. The walks share the scheduler
+        # so they're limited by the same concurrency budget.
+        await asyncio.gather(
+            *[
+                self._get_validator_data_for_mechid(
+                    subtensor, block, mechid, mechid_data["netuids"], mechid_data["metagraphs"]
+                )
+                for mechid, mechid_data in mechids_data.items()
+            ]
+        )
 
         total_time = round(time.time() - start_time)
         bittensor.logging.info(
             f"Subnet data gathered in {get_formatted_time(total_time)}."
         )
+        if self._archive_cache:
+            bittensor.logging.info(
+                f"Archive cache: {self._archive_cache.num_hits} hits, "
+                f"{self._archive_cache.num_misses} misses."
+            )
 
     async def _get_validator_data_for_mechid(self, subtensor, block, mechid, all_netuids, metagraphs):
         if mechid:
             # If this is mech 1+ then get the last_update atts from the metagraph_infos.
-            metagraph_infos = await asyncio.gather(
+            metagraph_infos = await self._scheduler.gather(
                 *[
                     subtensor.get_metagraph_info(netuid, block=block, mechid=mechid)
                     for netuid in all_netuids
@@ -166,8 +278,35 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
                 metagraph.last_update for metagraph in metagraphs
             ]
 
+        prefetcher = IntervalPrefetcher(
+            partial(
+                self._get_interval_inputs_at_block, subtensor, mechid=mechid, head_block=block
+            ),
+            self._scheduler,
+            self._speculative_depth,
+        )
+        # Each subnet is walked on its own so that a subnet that's slow to respond
+        # doesn't hold up the next interval of all the others.
+        try:
+            await asyncio.gather(
+                *[
+                    self._walk_intervals_for_mechid(
+                        subtensor, mechid, [netuid], [metagraphs[ni]], [last_updates[ni]],
+                        prefetcher
+                    )
+                    for ni, netuid in enumerate(all_netuids)
+                ]
+            )
+        finally:
+            await prefetcher.close()
+
+    async def _walk_intervals_for_mechid(
+            self, subtensor, mechid, all_netuids, metagraphs, last_updates, prefetcher
+    ):
         block_to_stop = {}
         last_weight_set_block = {}
+        rizzo_uids = {}
+        tempos = {}
         for ni, netuid in enumerate(all_netuids):
             metagraph = metagraphs[ni]
 
@@ -181,6 +320,7 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
 
             last_update = last_updates[ni]
             last_weight_set_block[netuid] = int(last_update[rizzo_uid])
+            rizzo_uids[netuid] = rizzo_uid
 
             if (
                 netuid in self._existing_data
@@ -192,8 +332,23 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
             else:
                 block_to_stop[netuid] = 0
 
+            # Until an interval has been seen the next weight setting block is
+            # predicted from the subnet's tempo.
+            tempo = getattr(metagraph, "tempo", None)
+            tempos[netuid] = tempo
+            prefetcher.prefetch(
+                netuid, last_weight_set_block[netuid], tempo and tempo + 1,
+                block_to_stop[netuid], self._num_intervals
+            )
+
+        if self._discover_intervals:
+            await self._discover_weight_set_blocks(
+                subtensor, mechid, rizzo_uids, tempos, last_weight_set_block, block_to_stop,
+                prefetcher
+            )
+
         netuids = all_netuids[:]
-        for _ in range(self._num_intervals):
+        for interval_num in range(self._num_intervals):
             netuids = [
                 n for n in netuids
                 if n in block_to_stop
@@ -209,23 +364,23 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
             # and it seems non-deterministic.
             # Putting this in a loop.
             #
-            metagraphs_data = {}
+            intervals_inputs = {}
             netuids_remaining = netuids[:]
             max_attemps = 3
             for attempt in range(max_attemps):
-                bittensor.logging.info(f"Attempt {attempt+1}: {netuids_remaining}")
-                metagraph_data = await asyncio.gather(
+                bittensor.logging.info(
+                    f"Mech {mechid} attempt {attempt+1}: {netuids_remaining}"
+                )
+                attempt_inputs = await asyncio.gather(
                     *[
-                        self._get_metagraph_data_for_netuid_at_block(
-                            subtensor, netuid, mechid, last_weight_set_block[netuid] - 1
-                        )
+                        prefetcher.get(netuid, last_weight_set_block[netuid] - 1)
                         for netuid in netuids_remaining
                     ]
                 )
                 failed_netuids = []
                 for ni, netuid in enumerate(netuids_remaining):
-                    if metagraph_data[ni]:
-                        metagraphs_data[netuid] = metagraph_data[ni]
+                    if attempt_inputs[ni] is not None:
+                        intervals_inputs[netuid] = attempt_inputs[ni]
                     else:
                         failed_netuids.append(netuid)
                 if not failed_netuids:
@@ -233,7 +388,9 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
                 netuids_remaining = failed_netuids
 
             for netuid in netuids:
-                if netuid not in metagraphs_data:
+                # The inputs are empty when the metagraph data at the block couldn't
+                # be used (i.e. Rizzo wasn't registered).
+                if not intervals_inputs.get(netuid):
                     bittensor.logging.warning(
                         f"Unable to obtain all {self._num_intervals} "
                         f"weight setting intervals for subnet {netuid}."
@@ -241,63 +398,12 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
                     del block_to_stop[netuid]
                     continue
 
-                metagraph_data = metagraphs_data[netuid]
-                if not metagraph_data:
-                    bittensor.logging.warning(
-                        f"Unable to obtain all {self._num_intervals} "
-                        f"weight setting intervals for subnet {netuid}."
-                    )
-                    del block_to_stop[netuid]
-                    continue
-
-                metagraph, metagraph_info = metagraph_data
-
-                # Get UID for Rizzo.
-                rizzo_uid = self._get_uid(metagraph)
-                if rizzo_uid is None:
-                    bittensor.logging.warning(
-                        f"Unable to obtain all {self._num_intervals} "
-                        f"weight setting intervals for subnet {netuid}."
-                    )
-                    del block_to_stop[netuid]
-                    continue
-
-                # Convert the last_update attribue in the metagraph_info from a tuple to a numpy array.
-                last_update = (
-                    numpy.array(metagraph_info.last_update, dtype=int) if mechid
-                    else metagraph.last_update
-                )
-
-                # There's some weirdness going on with sn72. Catching it here.
-                try:
-                    prev_weight_set_block = int(last_update[rizzo_uid])
-                    interval = last_weight_set_block[netuid] - prev_weight_set_block
-                    rizzo_vtrust = float(metagraph.Tv[rizzo_uid])
-                    rizzo_emission = float(metagraph.E[rizzo_uid])
-
-                    # Get all validator uids that have validator permits.
-                    all_uids = metagraph.uids[
-                        metagraph.validator_permit & (metagraph.uids != rizzo_uid)
-                    ]
-                    # Get all validators that have proper VT and U
-                    valid_uids = all_uids[
-                        (metagraph.Tv[all_uids] > MIN_VTRUST_THRESHOLD)
-                        & (last_weight_set_block[netuid] - last_update[all_uids] < MAX_U_THRESHOLD)
-                    ]
-
-                    if not len(valid_uids):
-                        avg_vtrust = None
-                    else:
-                        # Get min/max/average vTrust values.
-                        # vtrusts = [metagraph.Tv[uid] for uid in valid_uids]
-                        avg_vtrust = float(numpy.average(metagraph.Tv[valid_uids]))
-                except IndexError:
-                    bittensor.logging.warning(
-                        f"Unable to obtain all {self._num_intervals} "
-                        f"weight setting intervals for subnet {netuid}."
-                    )
-                    del block_to_stop[netuid]
-                    continue
+                interval_inputs = intervals_inputs[netuid]
+                prev_weight_set_block = interval_inputs["prev_weight_set_block"]
+                interval = last_weight_set_block[netuid] - prev_weight_set_block
+                rizzo_vtrust = interval_inputs["rizzo_vtrust"]
+                rizzo_emission = interval_inputs["rizzo_emission"]
+                avg_vtrust = interval_inputs["avg_vtrust"]
 
                 block_data = self.BlockData(
                     rizzo_emission=rizzo_emission,
@@ -312,6 +418,12 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
 
                 last_weight_set_block[netuid] = prev_weight_set_block
 
+                # Predict the rest of the walk from the interval that was just seen.
+                prefetcher.prefetch(
+                    netuid, prev_weight_set_block, interval, block_to_stop[netuid],
+                    self._num_intervals - interval_num - 1
+                )
+
         for netuid in all_netuids:
             if (
                 netuid in self._existing_data
@@ -327,7 +439,136 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
                     mech_block_data.blocks = mech_block_data.blocks[:self._num_intervals]
                     mech_block_data.block_data = mech_block_data.block_data[:self._num_intervals]
 
-    async def _get_metagraph_data_for_netuid_at_block(self, subtensor, netuid, mechid, block):
+    async def _discover_weight_set_blocks(
+            self, subtensor, mechid, rizzo_uids, tempos, last_weight_set_block, block_to_stop,
+            prefetcher
+    ):
+        # Find all of the weight setting blocks that the walk will go through from the
+        # LastUpdate storage history and prefetch the metagraph data at each of them.
+        # The walk still checks each block against the metagraph data so a block that
+        # was missed or is wrong only costs an extra request.
+        #
+        # The history is only searched back as far as the intervals should reach given
+        # the subnet's tempo (and never further than LAST_UPDATE_MAX_LOOKBACK_BLOCKS) so
+        # that a new subnet, or a uid that rarely sets weights, doesn't scan back to
+        # genesis. The walk fetches any interval before that on its own.
+        last_update_history = LastUpdateHistory(subtensor, self._scheduler)
+        netuids = list(rizzo_uids)
+        results = await asyncio.gather(
+            *[
+                last_update_history.get_weight_set_blocks(
+                    netuid, mechid, rizzo_uids[netuid], last_weight_set_block[netuid],
+                    self._get_discover_from_block(
+                        last_weight_set_block[netuid], block_to_stop[netuid], tempos[netuid]
+                    ),
+                    self._num_intervals
+                )
+                for netuid in netuids
+            ],
+            return_exceptions=True
+        )
+        for netuid, weight_set_blocks in zip(netuids, results):
+            if isinstance(weight_set_blocks, Exception):
+                bittensor.logging.warning(
+                    f"Failed to obtain the LastUpdate history for subnet {netuid} "
+                    f"mech {mechid}: {type(weight_set_blocks).__name__}: {weight_set_blocks}"
+                )
+                continue
+            prefetcher.prefetch_blocks(
+                netuid, [b for b in weight_set_blocks if b > block_to_stop[netuid]]
+            )
+
+    def _get_discover_from_block(self, to_block, block_to_stop, tempo):
+        lookback = LAST_UPDATE_MAX_LOOKBACK_BLOCKS
+        if tempo:
+            lookback = min(
+                self._num_intervals * (tempo + 1) * LAST_UPDATE_LOOKBACK_TEMPOS, lookback
+            )
+        return max(block_to_stop, to_block - lookback, 0)
+
+    async def _get_interval_inputs_at_block(self, subtensor, netuid, block, mechid, head_block):
+        # Returns the values that the BlockData of the interval ending at block + 1 is
+        # built from. Data at past blocks never changes so they're read through the
+        # archive cache when there is one. Returns None if the metagraph data couldn't
+        # be obtained.
+        cache_key = None
+        if self._archive_cache:
+            cache_key = await self._get_archive_cache_key(subtensor, netuid, mechid, block)
+            interval_inputs = self._archive_cache.get(cache_key)
+            if interval_inputs is not None:
+                return interval_inputs
+
+        metagraph_data = await self._get_metagraph_data_for_netuid_at_block(
+            subtensor, netuid, block, mechid
+        )
+        if not metagraph_data:
+            return None
+
+        metagraph, metagraph_info = metagraph_data
+        interval_inputs = self._get_interval_inputs(metagraph, metagraph_info, mechid, block + 1)
+
+        # Blocks close to the head of the chain could still be reorganized.
+        if cache_key and block < head_block - ARCHIVE_CACHE_FINALITY_BLOCKS:
+            self._archive_cache.put(cache_key, interval_inputs)
+
+        return interval_inputs
+
+    async def _get_archive_cache_key(self, subtensor, netuid, mechid, block):
+        if self._genesis_hash is None:
+            self._genesis_hash = await subtensor.substrate.get_block_hash(0)
+
+        # The inputs depend on which validator's uid is used and on the settings that
+        # they're computed with.
+        coldkey = self._other_coldkey or COLDKEYS["Rizzo"]
+        return (
+            self._genesis_hash, _INTERVAL_INPUTS_SETTINGS_HASH, coldkey, netuid, mechid, block
+        )
+
+    def _get_interval_inputs(self, metagraph, metagraph_info, mechid, weight_set_block):
+        # Get UID for Rizzo.
+        rizzo_uid = self._get_uid(metagraph)
+        if rizzo_uid is None:
+            return {}
+
+        # Convert the last_update attribue in the metagraph_info from a tuple to a numpy array.
+        last_update = (
+            numpy.array(metagraph_info.last_update, dtype=int) if mechid
+            else metagraph.last_update
+        )
+
+        # There's some weirdness going on with sn72. Catching it here.
+        try:
+            prev_weight_set_block = int(last_update[rizzo_uid])
+            rizzo_vtrust = float(metagraph.Tv[rizzo_uid])
+            rizzo_emission = float(metagraph.E[rizzo_uid])
+
+            # Get all validator uids that have validator permits.
+            all_uids = metagraph.uids[
+                metagraph.validator_permit & (metagraph.uids != rizzo_uid)
+            ]
+            # Get all validators that have proper VT and U
+            valid_uids = all_uids[
+                (metagraph.Tv[all_uids] > MIN_VTRUST_THRESHOLD)
+                & (weight_set_block - last_update[all_uids] < MAX_U_THRESHOLD)
+            ]
+
+            if not len(valid_uids):
+                avg_vtrust = None
+            else:
+                # Get min/max/average vTrust values.
+                # vtrusts = [metagraph.Tv[uid] for uid in valid_uids]
+                avg_vtrust = float(numpy.average(metagraph.Tv[valid_uids]))
+        except IndexError:
+            return {}
+
+        return {
+            "prev_weight_set_block": prev_weight_set_block,
+            "rizzo_vtrust": rizzo_vtrust,
+            "rizzo_emission": rizzo_emission,
+            "avg_vtrust": avg_vtrust,
+        }
+
+    async def _get_metagraph_data_for_netuid_at_block(self, subtensor, netuid, block, mechid):
         #
         # For some reason this raises random errors:
         #     "Failed to decode type: "scale_info::580" with type id: 580"
@@ -361,7 +602,10 @@ class SubnetDataIntervals(SubnetDataFromSubtensor, SubnetDataIntervalsBase):
 
 class SubnetDataIntervalsFromJson(SubnetDataBase, SubnetDataIntervalsBase):
     def __init__(self, json_folder, netuids=None, num_intervals=None):
+        # The interval store is kept in the json folder itself while the json files
+        # may be in the current published version.
         self._json_folder = json_folder
+        self._published_folder = get_published_folder(json_folder)
         self._netuids = netuids or self._get_netuids_from_json_folder()
         self._num_intervals = num_intervals
         self._other_coldkey = None
@@ -373,14 +617,16 @@ class SubnetDataIntervalsFromJson(SubnetDataBase, SubnetDataIntervalsBase):
         json_file_pattern = get_json_file_name(DATA_FILE_NAME, r"(?P<netuid>\d+)")
         json_file_pattern = json_file_pattern.replace(".", r"\.")
         json_file_regex = re.compile(rf"^{json_file_pattern}$")
-        for _file in os.listdir(self._json_folder):
-            regex_match = json_file_regex.match(_file)
+        for _file in os.listdir(self._published_folder):
+            regex_match = json_file_regex.match(strip_compression_suffix(_file))
             if regex_match:
                 netuids.append(int(regex_match.group("netuid")))
 
         return sorted(netuids)
 
     def _get_subnet_data(self):
+        interval_store = IntervalStore(self._json_folder)
+        manifest = read_manifest(self._published_folder)
         for netuid in self._netuids:
             self._validator_data[netuid] = self.ValidatorData(
                 subnet_emission=None,
@@ -388,12 +634,32 @@ class SubnetDataIntervalsFromJson(SubnetDataBase, SubnetDataIntervalsBase):
                 mech_block_data=[],
             )
 
-            json_file = os.path.join(
-                self._json_folder, get_json_file_name(DATA_FILE_NAME, netuid)
+            json_file_path = os.path.join(
+                self._published_folder, get_json_file_name(DATA_FILE_NAME, netuid)
             )
-            if not os.path.isfile(json_file):
+            json_file = find_json_file(json_file_path)
+
+            # Read from the interval store when it has the subnet at the same latest
+            # block as the published json file. The store is updated after the json
+            # files are published so it can be behind (or ahead) of them after a run
+            # that failed in between, in which case the json file is read.
+            meta = interval_store.read_meta(netuid)
+            if meta is not None and json_file is not None:
+                manifest_entry = manifest.get(os.path.basename(json_file)) or {}
+                store_block = interval_store.get_latest_block(
+                    netuid, len(meta["mech_emissions"])
+                )
+                if store_block is not None and store_block == manifest_entry.get("block"):
+                    self._get_subnet_data_from_store(netuid, interval_store, meta)
+                    continue
                 bittensor.logging.info(
-                    f"Json file ({json_file}) for netuid {netuid} does not exist."
+                    f"Interval store for netuid {netuid} is at block {store_block} "
+                    f"rather than {manifest_entry.get('block')}. Reading the json file."
+                )
+
+            if json_file is None:
+                bittensor.logging.info(
+                    f"Json file ({json_file_path}) for netuid {netuid} does not exist."
                 )
                 continue
 
@@ -402,10 +668,7 @@ class SubnetDataIntervalsFromJson(SubnetDataBase, SubnetDataIntervalsBase):
                 f"for netuid {netuid}."
             )
 
-            with open(json_file, "r") as fd:
-                json_data = json.load(fd)
-
-            json_data = json_data[str(netuid)]
+            json_data = get_json_reader().read(json_file)[str(netuid)]
 
             self._validator_data[netuid].subnet_emission = json_data["subnet_emission"]
             self._validator_data[netuid].subnet_alpha_price = json_data["subnet_alpha_price"]
@@ -434,9 +697,31 @@ class SubnetDataIntervalsFromJson(SubnetDataBase, SubnetDataIntervalsBase):
                     mech_block_data.blocks = json_mech_block_data["blocks"][:self._num_intervals]
                     mech_block_data.block_data = block_data[:self._num_intervals]
                 else:
-                    mech_block_data.blocks = json_mech_block_data["blocks"]
+                    # Copy the blocks since the json data is shared through the cache.
+                    mech_block_data.blocks = list(json_mech_block_data["blocks"])
                     mech_block_data.block_data = block_data
 
+    def _get_subnet_data_from_store(self, netuid, interval_store, meta):
+        bittensor.logging.info(
+            f"Obtaining existing data from the interval store for netuid {netuid}."
+        )
+
+        self._validator_data[netuid].subnet_emission = meta["subnet_emission"]
+        self._validator_data[netuid].subnet_alpha_price = meta["subnet_alpha_price"]
+
+        for mechid, mech_emission in enumerate(meta["mech_emissions"]):
+            records = interval_store.read(netuid, mechid, self._num_intervals)
+            self._validator_data[netuid].mech_block_data.append(
+                self.MechBlockData(
+                    mechid=mechid,
+                    mech_emission=mech_emission,
+                    blocks=records["block"].tolist(),
+                    block_data=[
+                        self.BlockData(**values) for values in get_block_data_values(records)
+                    ],
+                )
+            )
+
 
 class SubnetDataIntervalsFromMainData(SubnetDataBase, SubnetDataIntervalsBase):
     def __init__(
@@ -453,7 +738,8 @@ class SubnetDataIntervalsFromMainData(SubnetDataBase, SubnetDataIntervalsBase):
 
     def _get_subnet_data(self):
         existing_intervals_data = SubnetDataIntervalsFromJson(
-            self._json_intervals_folder, netuids=self._netuids
+            self._json_intervals_folder, netuids=self._netuids,
+            num_intervals=self._num_intervals
         ).validator_data
 
         for netuid in self._netuids:
@@ -508,22 +794,27 @@ class SubnetDataIntervalsFromMainData(SubnetDataBase, SubnetDataIntervalsBase):
                 if last_weight_block <= last_written_block:
                     mech_block_data.blocks.extend(existing_mech_block_data.blocks)
                     mech_block_data.block_data.extend(existing_mech_block_data.block_data)
-                    continue
-
-                # Set the actual interval.
-                interval = last_weight_block - last_written_block
-                block_data.rizzo_updated = interval
+                else:
+                    # Set the actual interval.
+                    interval = last_weight_block - last_written_block
+                    block_data.rizzo_updated = interval
 
-                # Set the new block and block data and add the existing ones.
-                mech_block_data.blocks.extend(
-                    [last_weight_block] + existing_mech_block_data.blocks
-                )
-                mech_block_data.block_data.extend(
-                    [block_data] + existing_mech_block_data.block_data
-                )
+                    # Set the new block and block data and add the existing ones.
+                    mech_block_data.blocks.extend(
+                        [last_weight_block] + existing_mech_block_data.blocks
+                    )
+                    mech_block_data.block_data.extend(
+                        [block_data] + existing_mech_block_data.block_data
+                    )
 
                 # If it's more than num_intervals then re-create it with the correct
                 # number of intervals.
-                if len(mech_block_data.blocks) > self._num_intervals:
+                if self._num_intervals and len(mech_block_data.blocks) > self._num_intervals:
                     mech_block_data.blocks = mech_block_data.blocks[:self._num_intervals]
                     mech_block_data.block_data = mech_block_data.block_data[:self._num_intervals]
+
+
+def get_latest_interval_block(validator_data):
+    # Returns the latest weight setting block over all mechs of the ValidatorData.
+    blocks = [m.blocks[0] for m in validator_data.mech_block_data if m.blocks]
+    return max(blocks) if blocks else None
@@ -7,17 +7,26 @@ import bittensor
 # standart imports
 import asyncio
 from dataclasses import dataclass, make_dataclass
+from functools import partial
 import numpy
 import time
 
 # Local imports
 from .constants import (
+    DEFAULT_MAX_CONCURRENCY,
     MIN_VTRUST_THRESHOLD,
     MAX_U_THRESHOLD,
     COLDKEYS,
     RIZZO_CHK_HOTKEY,
     RIZZO_HOTKEYS,
 )
+from .metagraph_projection import (
+    get_all_metagraph_infos,
+    get_all_metagraph_projections,
+    get_mech_metagraph_projection,
+    get_metagraph_projection,
+)
+from .storage_reader import BulkStorageReader, get_child_hotkeys
 from .subnet_data_base import SubnetDataFromSubtensor
 
 
@@ -74,26 +83,89 @@ class SubnetDataMain(SubnetDataFromSubtensor):
         "ValidatorHotkeys", [(k, str) for k in COLDKEYS]
     )
 
-    def __init__(self, network, netuids=None, chunk_size=0, other_coldkey=None):
+    def __init__(
+            self, network, netuids=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+            other_coldkey=None, fetch_mode="metagraph", persistent_subtensor=None
+    ):
         self._netuids = netuids
         self._network = network
-        self._chunk_size = chunk_size
+        self._max_concurrency = max_concurrency
         self._other_coldkey = self._get_other_coldkey(other_coldkey)
+        self._fetch_mode = fetch_mode
+        self._persistent_subtensor = persistent_subtensor
+        self._all_metagraph_infos = {}
 
         super().__init__()
 
+    @property
+    def registered_netuids(self):
+        # The subnets that the Rizzo validator is registered on.
+        return sorted(
+            netuid for netuid, validator_data in self._validator_data.items()
+            if validator_data.validator_hotkeys.Rizzo
+        )
+
     def _get_chk_hotkey(self):
         return RIZZO_CHK_HOTKEY
 
     def _get_subnet_data(self):
-        asyncio.run(self._async_get_subnet_data())
-
-    async def _get_validator_data(self, subtensor, netuids):
-        async def dummy_chk_take_func():
-            class DummyChkTake:
-                value = 0
-            return DummyChkTake()
+        self._run_async_get_subnet_data()
+
+    async def _get_metagraphs(self, subtensor, netuids, block):
+        # The bulk fetch mode gets the metagraph info of every subnet in one runtime
+        # API call. Any subnet that isn't in the bulk response is fetched on its own.
+        bulk_metagraphs = {}
+        if self._fetch_mode == "bulk":
+            metagraph_infos = await self._get_all_metagraph_infos(subtensor, block)
+            if metagraph_infos is not None:
+                storage_reader = BulkStorageReader(subtensor, self._scheduler, block)
+                bulk_metagraphs = await get_all_metagraph_projections(
+                    netuids, metagraph_infos, storage_reader
+                )
 
+        missing_netuids = [netuid for netuid in netuids if netuid not in bulk_metagraphs]
+        if bulk_metagraphs and missing_netuids:
+            bittensor.logging.warning(
+                f"Subnets missing from the bulk metagraph info: {missing_netuids}"
+            )
+        missing_metagraphs = await self._scheduler.gather_retry(
+            *[
+                (
+                    (netuid, "metagraph"),
+                    partial(self._get_metagraph, subtensor, netuid, block)
+                )
+                for netuid in missing_netuids
+            ]
+        )
+        bulk_metagraphs.update(zip(missing_netuids, missing_metagraphs))
+
+        return [bulk_metagraphs[netuid] for netuid in netuids]
+
+    async def _get_all_metagraph_infos(self, subtensor, block):
+        # The bulk response covers every subnet so it's only requested once per block
+        # and shared by the shard batches and the retries. It's kept as a task so that
+        # concurrent batches wait on the same request, and shielded so that a cancelled
+        # batch doesn't cancel it for the others. A failed request (None) is kept too,
+        # leaving the subnets to the per-subnet fallback. Only the latest block is kept.
+        if block not in self._all_metagraph_infos:
+            self._all_metagraph_infos = {
+                block: asyncio.ensure_future(get_all_metagraph_infos(subtensor, block))
+            }
+        return await asyncio.shield(self._all_metagraph_infos[block])
+
+    async def _get_metagraph(self, subtensor, netuid, block):
+        # The projection fetch mode only pulls the fields that are used to populate
+        # the validator data rather than decoding the entire metagraph.
+        if self._fetch_mode in ("projection", "bulk"):
+            return await get_metagraph_projection(subtensor, netuid, block)
+        return await subtensor.metagraph(netuid, block=block)
+
+    async def _get_mech_metagraph_info(self, subtensor, netuid, block, mechid):
+        if self._fetch_mode in ("projection", "bulk"):
+            return await get_mech_metagraph_projection(subtensor, netuid, block, mechid)
+        return await subtensor.get_metagraph_info(netuid, block=block, mechid=mechid)
+
+    async def _get_validator_data(self, subtensor, netuids, block=None):
         if type(netuids) != list:
             netuids = [netuids]
 
@@ -101,106 +173,106 @@ class SubnetDataMain(SubnetDataFromSubtensor):
         bittensor.logging.info(f"Obtaining data for subnets: {netuids}")
 
         # Get the block to pass to async calls so everything is in sync
-        block = await subtensor.block
+        if block is None:
+            block = await subtensor.block
 
-        # Get mechanisms for each netuid
-        mech_splits = await asyncio.gather(
-            *[
-                subtensor.get_mechanism_emission_split(netuid, block=block)
-                for netuid in netuids
-            ]
+        # Get the mechanisms, metagraphs, child hotkeys and pending child hotkeys for each
+        # netuid. None of these depend on each other so they're all requested at once and
+        # the scheduler keeps the requests flowing across subnets.
+        #
+        # Each request is retried on its own and a request that still fails only
+        # fails the subnet that it belongs to.
+        mech_splits, metagraphs, children, children_pending = await asyncio.gather(
+            self._scheduler.gather_retry(
+                *[
+                    (
+                        (netuid, "mechanism emission split"),
+                        partial(subtensor.get_mechanism_emission_split, netuid, block=block)
+                    )
+                    for netuid in netuids
+                ]
+            ),
+            self._get_metagraphs(subtensor, netuids, block),
+            self._get_children(subtensor, netuids, block),
+            self._get_children_pending(subtensor, netuids, block),
         )
-        # get_mechanism_emission_split will return None for subnets that have one mech
-        # so replace None with a list with a single emission value of 100%
-        mech_splits = [m or [100] for m in mech_splits]
 
-        # Get the metagraph for each netuid
-        metagraphs = await asyncio.gather(
-            *[
-                subtensor.metagraph(netuid, block=block)
-                for netuid in netuids
-            ]
+        # Drop the subnets that failed. They're gathered again on the next attempt
+        # without refetching the subnets that succeeded.
+        failed_netuids = self._get_failed_netuids(
+            netuids, mech_splits, metagraphs, children, children_pending
         )
-
-        # Get the metagraph info for mechs 1+ for each netuid with multiple mechs.
-        metagraph_info_results = await asyncio.gather(
-            *[
-                subtensor.get_metagraph_info(netuid, block=block, mechid=mechid)
-                for i, netuid in enumerate(netuids) for mechid in range(1, len(mech_splits[i]))
+        if failed_netuids:
+            keep = [i for i, netuid in enumerate(netuids) if netuid not in failed_netuids]
+            netuids, mech_splits, metagraphs, children, children_pending = [
+                [values[i] for i in keep]
+                for values in (netuids, mech_splits, metagraphs, children, children_pending)
             ]
-        )
-        # Store the metagraph_infos in a dictionary where the keys are the netuids and the values
-        # are a list of metagraph infos for mechs 1+.
-        all_metagraph_infos = {}
-        i = 0
-        for ni, netuid in enumerate(netuids):
-            metagraph_infos_for_netuid = []
-            for _ in range(1, len(mech_splits[ni])):
-                metagraph_infos_for_netuid.append(metagraph_info_results[i])
-                i += 1
-            all_metagraph_infos[netuid] = metagraph_infos_for_netuid
+
+        # get_mechanism_emission_split will return None for subnets that have one mech
+        # so replace None with a list with a single emission value of 100%
+        mech_splits = [m or [100] for m in mech_splits]
 
         # No point in printing CHK column when checking a different
         # coldkey until we figure out exactly how the CHK'ing is going
         # to work for us vs. rt21 and others and the code is updated
         # accordingly.
         if self._other_coldkey:
-            children = [(True, [], '') for _ in netuids]
-            children_pending = [([], 0) for _ in netuids]
             swap_child_hotkeys = dict([(n, (0.0, "")) for n in netuids])
         else:
-            # Get the list of child hotkeys for each netuid
-            children = await asyncio.gather(
-                *[
-                    subtensor.get_children(self._get_chk_hotkey(), netuid)
-                    for netuid in netuids
-                ]
-            )
             swap_child_hotkeys = self._filter_swap_hotkeys(
                 metagraphs, children, False
             )
-
-            # Get the list of pending child hotkeys for each netuid
-            children_pending = await asyncio.gather(
-                *[
-                    subtensor.get_children_pending(self._get_chk_hotkey(), netuid)
-                    for netuid in netuids
-                ]
-            )
             # self._filter_swap_hotkeys(
             #     metagraphs, children_pending, True
             # )
 
-        # Get the take for each child hotkey on each netuid.
-        chk_takes_dict = await self._get_child_hotkey_take_data(
-            subtensor, netuids, children, False
-        )
-
-        # Get the take for each pending child hotkey on each netuid.
-        chk_takes_pending_dict = await self._get_child_hotkey_take_data(
-            subtensor, netuids, children_pending, True
+        # Get the metagraph info for mechs 1+ for each netuid with multiple mechs and
+        # the CHK take for each child hotkey, pending child hotkey and our own hotkey
+        # on each netuid.
+        (
+            metagraph_info_results,
+            (chk_takes_dict, chk_takes_pending_dict, rizzo_hotkey_chk_takes),
+        ) = await asyncio.gather(
+            self._scheduler.gather_retry(
+                *[
+                    (
+                        (netuid, f"mech {mechid} metagraph info"),
+                        partial(self._get_mech_metagraph_info, subtensor, netuid, block, mechid)
+                    )
+                    for i, netuid in enumerate(netuids) for mechid in range(1, len(mech_splits[i]))
+                ]
+            ),
+            self._get_chk_take_data(subtensor, netuids, children, children_pending, block),
         )
+        # Store the metagraph_infos in a dictionary where the keys are the netuids and the values
+        # are a list of metagraph infos for mechs 1+.
+        all_metagraph_infos = {}
+        i = 0
+        for ni, netuid in enumerate(netuids):
+            metagraph_infos_for_netuid = []
+            for _ in range(1, len(mech_splits[ni])):
+                metagraph_infos_for_netuid.append(metagraph_info_results[i])
+                i += 1
+            all_metagraph_infos[netuid] = metagraph_infos_for_netuid
 
-        # Get the CHK take for all of our local swap hotkeys so we can ensure
-        # that only the hotkeys on subnets that we own have 0% take. These will
-        # be displayed next to the hotkeys in the Subnet Hotkeys tab on the
-        # ValidatorStatus web page.
-        chk_take_func_calls = []
-        for netuid in netuids:
-            hotkey = RIZZO_HOTKEYS.get(netuid)
-            if hotkey:
-                chk_take_func_calls.append(
-                    subtensor.query_subtensor("ChildkeyTake", params=[hotkey, netuid])
+        failed_netuids.update(
+            netuid for netuid in netuids
+            if any(
+                isinstance(r, Exception)
+                for r in (
+                    all_metagraph_infos[netuid]
+                    + chk_takes_dict.get(netuid, [])
+                    + chk_takes_pending_dict.get(netuid, [])
+                    + [rizzo_hotkey_chk_takes[netuid]]
                 )
-            else:
-                chk_take_func_calls.append(dummy_chk_take_func())
-        rizzo_hotkey_chk_takes = [
-            bittensor.u16_normalized_float(r.value)
-            for r in await asyncio.gather(*chk_take_func_calls)
-        ]
+            )
+        )
 
         # Get all of the rest of the data from the metagraph.
         for i, netuid in enumerate(netuids):
+            if netuid in failed_netuids:
+                continue
             subnet_mechs = mech_splits[i]
             metagraph = metagraphs[i]
             metagraph_infos = all_metagraph_infos[netuid]
@@ -209,7 +281,7 @@ class SubnetDataMain(SubnetDataFromSubtensor):
             swap_child_hotkey = swap_child_hotkeys[netuid]
             child_hotkeys_pending, chk_pending_block = children_pending[i]
             child_takes_pending = chk_takes_pending_dict.get(netuid, [])
-            rizzo_hotkey_chk_take = rizzo_hotkey_chk_takes[i]
+            rizzo_hotkey_chk_take = rizzo_hotkey_chk_takes[netuid]
             self._populate_validator_data_for_subnet(
                 netuid, subnet_mechs, metagraph, metagraph_infos, child_hotkeys, child_takes,
                 swap_child_hotkey, child_hotkeys_pending, child_takes_pending, block,
@@ -221,6 +293,53 @@ class SubnetDataMain(SubnetDataFromSubtensor):
             f"Data gathered in {int(total_time)} seconds for subnets: {netuids}."
         )
 
+    @staticmethod
+    def _get_failed_netuids(netuids, *results):
+        return {
+            netuid for i, netuid in enumerate(netuids)
+            if any(isinstance(result[i], Exception) for result in results)
+        }
+
+    async def _get_children(self, subtensor, netuids, block):
+        if self._other_coldkey:
+            return [(True, [], '') for _ in netuids]
+
+        # Get the list of child hotkeys for each netuid. The ChildKeys storage
+        # for our parent hotkey on every netuid is read with a few multi-key
+        # requests rather than one get_children call per netuid.
+        storage_reader = BulkStorageReader(subtensor, self._scheduler, block)
+        values = await storage_reader.query(
+            "ChildKeys", [[self._get_chk_hotkey(), netuid] for netuid in netuids]
+        )
+
+        # Return the same format as get_children
+        return [
+            value if isinstance(value, Exception)
+            else (True, get_child_hotkeys(value or []), "")
+            for value in values
+        ]
+
+    async def _get_children_pending(self, subtensor, netuids, block):
+        if self._other_coldkey:
+            return [([], 0) for _ in netuids]
+
+        # Get the list of pending child hotkeys for each netuid. Note that the
+        # PendingChildKeys storage is keyed by netuid first.
+        storage_reader = BulkStorageReader(subtensor, self._scheduler, block)
+        values = await storage_reader.query(
+            "PendingChildKeys", [[netuid, self._get_chk_hotkey()] for netuid in netuids]
+        )
+
+        # Return the same format as get_children_pending
+        results = []
+        for value in values:
+            if isinstance(value, Exception):
+                results.append(value)
+            else:
+                children, cooldown_block = value or ([], 0)
+                results.append((get_child_hotkeys(children), cooldown_block))
+        return results
+
     def _filter_swap_hotkeys(self, metagraphs, children, do_pending):
         swap_child_hotkeys = {}
         for i, netuid_element in enumerate(children):
@@ -246,48 +365,58 @@ class SubnetDataMain(SubnetDataFromSubtensor):
 
         return swap_child_hotkeys
 
-    async def _get_child_hotkey_take_data(
-            self, subtensor, netuids, children, do_pending
-    ):
-        # Get the take for each child hotkey on each netuid.
-        chk_take_func_calls = []
-        chk_take_funcs_dict = {}
-        chk_takes_dict = {}
-        func_call_index = 0
+    async def _get_chk_take_data(self, subtensor, netuids, children, children_pending, block):
+        # Get the take for each child hotkey and pending child hotkey on each netuid.
+        #
+        # Also get the CHK take for all of our local swap hotkeys so we can ensure
+        # that only the hotkeys on subnets that we own have 0% take. These will
+        # be displayed next to the hotkeys in the Subnet Hotkeys tab on the
+        # ValidatorStatus web page.
+        #
+        # All of the ChildkeyTake storage keys are read at once with a few
+        # multi-key requests at the pinned block.
+        take_keys = []
+        take_params = []
         for i, netuid in enumerate(netuids):
-            if do_pending:
-                child_hotkeys, _ = children[i]
-            else:
-                success, child_hotkeys, msg = children[i]
-                if not success:
-                     bittensor.logging.error(
-                        f"Failed to obtain child hotkeys from netuid {netuid}: {msg}"
-                    )
-
-            chk_take_funcs_dict[netuid] = []
-            for _, child_hotkey in child_hotkeys:
-                chk_take_func_calls.append(
-                    subtensor.query_subtensor(
-                        "ChildkeyTake",
-                        params=[child_hotkey, netuid]
-                    )
+            success, child_hotkeys, msg = children[i]
+            if not success:
+                bittensor.logging.error(
+                    f"Failed to obtain child hotkeys from netuid {netuid}: {msg}"
                 )
-                chk_take_funcs_dict[netuid].append(func_call_index)
-                func_call_index += 1
-        all_child_takes = (
-            [
-                bittensor.u16_normalized_float(r.value)
-                for r in await asyncio.gather(*chk_take_func_calls)
-            ]
-            if chk_take_func_calls else []
-        )
+            for _, child_hotkey in child_hotkeys:
+                take_keys.append((netuid, False))
+                take_params.append([child_hotkey, netuid])
+
+            child_hotkeys_pending, _ = children_pending[i]
+            for _, child_hotkey in child_hotkeys_pending:
+                take_keys.append((netuid, True))
+                take_params.append([child_hotkey, netuid])
+
+            hotkey = RIZZO_HOTKEYS.get(netuid)
+            if hotkey:
+                take_keys.append((netuid, None))
+                take_params.append([hotkey, netuid])
+
+        storage_reader = BulkStorageReader(subtensor, self._scheduler, block)
+        take_values = await storage_reader.query("ChildkeyTake", take_params)
 
         # Massage the child take data to make it easier to obtain later on.
-        for i, netuid in enumerate(netuids):
-            cti = chk_take_funcs_dict.get(netuid)
-            chk_takes_dict[netuid] = all_child_takes[cti[0]:cti[-1]+1] if cti else []
+        chk_takes_dict = {netuid: [] for netuid in netuids}
+        chk_takes_pending_dict = {netuid: [] for netuid in netuids}
+        rizzo_hotkey_chk_takes = {netuid: 0.0 for netuid in netuids}
+        for (netuid, do_pending), value in zip(take_keys, take_values):
+            take = (
+                value if isinstance(value, Exception)
+                else bittensor.u16_normalized_float(value or 0)
+            )
+            if do_pending is None:
+                rizzo_hotkey_chk_takes[netuid] = take
+            elif do_pending:
+                chk_takes_pending_dict[netuid].append(take)
+            else:
+                chk_takes_dict[netuid].append(take)
 
-        return chk_takes_dict
+        return chk_takes_dict, chk_takes_pending_dict, rizzo_hotkey_chk_takes
 
     def _populate_validator_data_for_subnet(
             self, netuid, subnet_mechs, metagraph, metagraph_infos, child_hotkeys, child_takes,
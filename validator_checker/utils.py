@@ -1,10 +1,16 @@
 # standard imports
+import hashlib
+import json
 import os
 import random
 
 
 # Import local constants
-from .constants import LOCAL_LITE_SUBTENSORS
+from .constants import (
+    LOCAL_LITE_SUBTENSORS,
+    MANIFEST_FILE_NAME,
+    PUBLISH_CURRENT_LINK_NAME,
+)
 
 
 class SubtensorConnectionError(Exception):
@@ -35,16 +41,16 @@ def get_formatted_time(total_time):
     return formatted_time
 
 
+def _get_network_from_name(name):
+    return name if ":" in name else f"ws://subtensor-{name}.rizzo.network:9944"
+
+
 def _create_get_lite_subtensor_network():
     # Randomize local subtensor.
     random.seed()
     local_subtensor_index = random.randint(0, len(LOCAL_LITE_SUBTENSORS) - 1)
 
     def get_network(name=None):
-
-        def get_network_from_name(name):
-            return name if ":" in name else f"ws://subtensor-{name}.rizzo.network:9944"
-        
         if name is False:
             return "finney"
 
@@ -53,13 +59,45 @@ def _create_get_lite_subtensor_network():
             local_subtensor_index = (local_subtensor_index + 1) % len(LOCAL_LITE_SUBTENSORS)
             name = LOCAL_LITE_SUBTENSORS[local_subtensor_index]
 
-        return get_network_from_name(name)
+        return _get_network_from_name(name)
     
     return get_network
 
 get_lite_subtensor_network = _create_get_lite_subtensor_network()
 
 
+def get_lite_subtensor_networks(names=None):
+    # Get the networks for all local subtensors to shard a run across them.
+    return [_get_network_from_name(name) for name in names or LOCAL_LITE_SUBTENSORS]
+
+
 def get_json_file_name(json_file_name, netuid):
     json_base, json_ext = os.path.splitext(json_file_name)
     return f"{json_base}.{netuid}{json_ext}"
+
+
+def get_published_folder(json_folder):
+    # Returns the folder holding the latest json files. When the writers publish
+    # versioned folders this is the version that the current link points to, which
+    # is resolved so that a reader keeps reading the same version even if a new one
+    # is published in the middle.
+    current_folder = os.path.join(json_folder, PUBLISH_CURRENT_LINK_NAME)
+    if os.path.isdir(current_folder):
+        return os.path.realpath(current_folder)
+    return json_folder
+
+
+def get_file_hash(file_path):
+    with open(file_path, "rb") as fp:
+        return hashlib.sha256(fp.read()).hexdigest()
+
+
+def read_manifest(json_folder):
+    # Returns the manifest written by the json writers, which maps the file names to
+    # their hash, block, size and write time, or an empty dict if there's none.
+    manifest_file = os.path.join(json_folder, MANIFEST_FILE_NAME)
+    try:
+        with open(manifest_file, "r") as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return {}